@@ -1,5 +1,17 @@
-from . import libcamera
-from . import libdisplay
-from . import libstocks
-from . import libtimer
-from . import libtrading
+import importlib
+
+# Subpackages are only imported on first use, so importing btb does not pull
+# in Tk, OpenCV, pandas or pyrh until they are needed.
+__all__ = ["libcamera", "libdisplay", "libstocks", "libtimer", "libtrading"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -11,19 +11,19 @@ import time
 import keyring
 
 # From libcamera
-from .libcamera import Camera
+from .libcamera import Camera, PresenceFilter
 
 # From libdisplay
-from .libdisplay import Display
+from .libdisplay import create_display
 
 # From libstocks
-from .libstocks import Stocks
+from .libstocks import Rotation
 
 # From libtimer
 from .libtimer import Timer
 
 # From libtrading
-from .libtrading import Trading
+from .libtrading import OrderExecutor, Trading
 
 
 def main():
@@ -48,7 +48,28 @@ def main():
     camera_device: int = 0
 
     # The resolution (veritical pixel count).
-    resolution: int = 480
+    resolution: int = 720
+
+    # Detection runs on a grayscale copy reduced by this factor so that
+    # recording at a higher resolution does not slow detection down.
+    detection_scale: float = 0.5
+
+    # Skip detection on frames where nothing moved.
+    motion_gate: bool = True
+
+    # Once Buddy is found, follow him with a cheap tracker and only re-run
+    # the full detector every few frames.
+    track: bool = True
+    redetect_interval: int = 5
+
+    # Both cat face cascades run in parallel worker processes and a
+    # detection is only accepted when they agree.
+    vote_rule: str = "majority"
+
+    # Target detection time per frame in seconds. Detection resolution, and
+    # then the number of frames detected on, is reduced at runtime to stay
+    # within it, e.g. when the Pi is thermally throttled.
+    frame_budget: float = 0.1
 
     # The frames per second.
     framerate: int = 10
@@ -56,97 +77,168 @@ def main():
     # Brightness (0-100%), defaults to 50%.
     brightness: int = 65
 
+    # Number of captured frames buffered ahead of detection. Detection
+    # always runs on the newest frame and stale frames are dropped.
+    buffer_depth: int = 2
+    frame_policy: str = "latest"
+
+    # Only record clips around detections, keeping the seconds leading up
+    # to each one.
+    record_mode: str = "clips"
+    pre_roll: float = 5.0
+    post_roll: float = 5.0
+
     camera = Camera(
         camera_device,
-        os.path.join(os.path.dirname(__file__), "libcamera/data/output.mp4"),
+        os.path.join(os.path.dirname(__file__), "libcamera/data/clips"),
         resolution,
         framerate,
         brightness,
-        os.path.join(
-            os.path.dirname(__file__), "libcamera/data/haarcascade_frontalcatface.xml"
-        ),
+        [
+            os.path.join(
+                os.path.dirname(__file__),
+                "libcamera/data/haarcascade_frontalcatface.xml",
+            ),
+            os.path.join(
+                os.path.dirname(__file__),
+                "libcamera/data/haarcascade_frontalcatface_extended.xml",
+            ),
+        ],
+        buffer_depth,
+        frame_policy,
+        record_mode=record_mode,
+        pre_roll=pre_roll,
+        post_roll=post_roll,
+        detection_scale=detection_scale,
+        motion_gate=motion_gate,
+        track=track,
+        redetect_interval=redetect_interval,
+        vote_rule=vote_rule,
+        frame_budget=frame_budget,
     )
 
-    display = Display(enable_progress=True)
+    # Display backend, tk for the screen, image to render into a file or
+    # framebuffer device, or headless to run without one.
+    display_backend: str = os.environ.get("BTB_DISPLAY", "tk")
+    display = create_display(display_backend, enable_progress=True)
 
     # Number of minutes a stock will be available for trade.
     trading_increment: int = 1
 
     timer = Timer(trading_increment)
 
+    # Quotes are reused for up to quote_max_age seconds. The quote of the
+    # stock on screen is refreshed in the background every quote_refresh
+    # seconds so that a trade never waits on one.
+    quote_max_age: float = 2.0
+    quote_refresh: float = 1.0
+
     trading = Trading(
         keyring.get_password("robinhood", "username"),
         keyring.get_password("robinhood", "password"),
         keyring.get_password("robinhood", "qr_code"),
+        quote_max_age,
+        quote_refresh,
+    )
+
+    # Order in which stocks are available for trade, one of sequential,
+    # shuffle or weighted (by market capitalization). The next stock's
+    # quote and instrument data are fetched in the background once the
+    # current one is this far (percent) through its time.
+    rotation_strategy: str = "sequential"
+    prefetch_at: int = 90
+    rotation = Rotation(
+        strategy=rotation_strategy, prefetch=trading.prefetch, prefetch_at=prefetch_at
     )
 
-    # Index used to iterate over all stocks.
-    index = 0
+    # Instrument IDs and URLs of the stocks are known from the constituents
+    # file, so orders and position lookups do not need to fetch them.
+    trading.instruments.seed(
+        rotation.universe.symbol.tolist(), rotation.universe.instrument_id.tolist()
+    )
 
     # Get first stock to potentially be traded.
-    stock = Stocks(index)
+    stock = rotation.current
+    trading.watch(stock.symbol)
 
     # Display the first stock symbol.
     display.write(stock.symbol)
 
-    # Counter used to determine the number of frames
-    # Buddy has been detected in.
-    buddy_present_count: int = 0
-    buddy_present_threshold: int = 10
+    # Buddy counts as present once the detection confidence summed over
+    # the last presence_window frames reaches presence_required, so that a
+    # few spurious detections spread over a long time never add up to a
+    # trade. Any detection counts as at least half a frame, rising to one
+    # full frame for a detection scoring presence_saturation or more.
+    presence_window: int = 30
+    presence_required: float = 10.0
+    presence_saturation: float = 2.0
+    presence_rule: str = "k_of_n"
+    presence = PresenceFilter(
+        presence_window, presence_rule, presence_required, presence_saturation
+    )
 
     # For this project holding keeping ten stocks
     # in rotation seems like a good round numeber
     stocks_to_hold: int = 10
 
+    def trade(symbol):
+        # Free up funds. The Robinhood API seems to keep track
+        # of their "instrument ID" for the securities owned by
+        # an account rather than the direct ticker. This
+        # "instrument ID" needs converted back to a stock
+        # ticker (symbol) to make use of the wrapper functions
+        # within the Trading class.
+        if (1 / stocks_to_hold) > trading.liquidity():
+            LRP = trading.get_least_recently_purchased()
+            LRP_ticker = trading.instruments.symbol(LRP["instrument_id"])
+            trading.sell_quantity(LRP_ticker, LRP["quantity"])
+
+        # Buy, buy, buy!!
+        trading.buy_with_current_funds(symbol)
+
+    # Trades run on a worker thread, one at a time, so that detection and
+    # the display carry on while orders are placed.
+    executor = OrderExecutor()
+
     # --------------- #
     # -- Main loop -- #
     # --------------- #
 
     while True:
-        # If Buddy has been detected enough to exceed the threshold.
-        if buddy_present_count > buddy_present_threshold:
-            # Free up funds. The Robinhood API seems to keep track
-            # of their "instrument ID" for the securities owned by
-            # an account rather than the direct ticker. This
-            # "instrument ID" needs converted back to a stock
-            # ticker (symbol) to make use of the wrapper functions
-            # within the Trading class.
-            if (1 / stocks_to_hold) > trading.liquidity():
-                LRP = trading.get_least_recently_purchased()
-                LRP_ticker = stock.find_ticker_by_instrument_id(LRP["instrument_id"])
-                trading.sell_quantity(LRP_ticker, LRP["quantity"])
-
-            # Buy, buy, buy!!
-            trading.buy_with_current_funds(stock.symbol)
-            buddy_present_count = 0
-            # Reset the top bar showing the number of frames
-            # remaining that Buddy must be detected for the purchase
-            # to go through.
+        # If Buddy has been detected confidently enough.
+        if presence.present:
+            executor.submit(trade, stock.symbol)
+            presence.reset()
+            # Reset the top bar showing how close Buddy is to making
+            # the purchase go through.
             display.loading_bar(0, True)
 
         # If its time to get a new stock.
         if timer.get_timer_hit():
             timer.restart_timer()
-            index += 1 % stock.size()
-            stock = Stocks(index)
+            stock = rotation.next()
+            trading.watch(stock.symbol)
             # Update the display symbol.
             display.write(stock.symbol)
-            # Restart counter for new stock.
-            buddy_present_count = 0
+            # Restart presence for new stock.
+            presence.reset()
 
         # Update the bottom display loading bar showing the amount of time left
-        # for the current stock.
-        display.loading_bar(timer.timer(), False)
-
-        # Increment counter each time Buddy is seen by the camera.
-        if camera.present():
-            buddy_present_count += 1
-            # Increment the top bar showing the number of frames
-            # remaining that Buddy must be detected for the purchase
-            # to go through.
-            display.loading_bar(
-                int(buddy_present_count / buddy_present_threshold * 100), True
-            )
+        # for the current stock, and warm the next stock's data when the time
+        # is nearly up.
+        elapsed = timer.timer()
+        display.loading_bar(elapsed, False)
+        rotation.progress(elapsed)
+
+        # Add the frame's detections to the presence window and update the
+        # top bar showing how close Buddy is to making the purchase go
+        # through. Only frames the detector ran on count: tracked frames
+        # follow an earlier detection and skipped frames repeat one, so
+        # neither adds evidence of its own.
+        rects = camera.coordinates()
+        if camera.path in ("detect", "gated"):
+            score = presence.update(rects, camera.scores)
+            display.loading_bar(int(score * 100), True)
 
 
 if __name__ == "__main__":
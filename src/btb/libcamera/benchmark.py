@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+.. module:: benchmark
+   :platform: Unix, Windows
+   :synopsis: Offline detector benchmark over recorded video.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Runs the detection pipeline over a recorded video as fast as possible and reports throughput, latency
+    percentiles and detections for each cascade or model and parameter set.
+
+Example::
+
+    python -m btb.libcamera.benchmark footage.mp4 --scale 1.0 0.5 --min-neighbors 3 5 --workers 4
+    python -m btb.libcamera.benchmark footage.mp4 --model face.caffemodel --config face.prototxt --batch 4
+"""
+
+# From the Python Standard Library
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import logging
+import os
+import time
+
+# From Open Computer Vision
+import cv2
+
+# From NumPy
+import numpy as np
+
+# From libcamera
+from .camera import Camera
+from .detectors import DnnDetector
+from .preprocess import prepare, remap
+
+
+def _detector(spec):
+    """
+    Builds a detector from a picklable description, so each worker process can load its own.
+
+    :param spec: Cascade classifier xml file, or DnnDetector keyword arguments.
+    :type spec: str or dict
+
+    :return: Cascade file, passed on to Camera, or a DNN detector.
+    :rtype: str or DnnDetector
+    """
+    if isinstance(spec, dict):
+        return DnnDetector(**spec)
+    return spec
+
+
+def _run(video, start, stop, settings, batch=1):
+    """
+    Runs the detection pipeline over a range of frames of a video.
+
+    :param video: Path to the video.
+    :type video: str
+    :param start: Index of the first frame.
+    :type start: int
+    :param stop: Index one past the last frame.
+    :type stop: int
+    :param settings: Camera keyword arguments, with the detector described as for _detector.
+    :type settings: dict
+    :param batch: Frames handed to the detector at once, defaults to 1. Batches bypass the motion gate and tracker
+        and each frame is charged an equal share of its batch's time.
+    :type batch: int, optional
+
+    :return: Per frame latencies in seconds, frames with a detection, total rectangles and the detection path
+        counts.
+    :rtype: dict
+    """
+    settings = dict(settings, detector=_detector(settings["detector"]))
+    camera = Camera(None, None, None, None, None, **settings)
+    cap = cv2.VideoCapture(video)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    latencies = []
+    detected = 0
+    rects = 0
+    frames = []
+    for index in range(start, stop):
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+        if len(frames) < batch and ret and index < stop - 1:
+            continue
+        if not frames:
+            break
+        begin = time.perf_counter()
+        if 1 == batch:
+            results = [camera.process(frame) for frame in frames]
+        else:
+            images = [
+                prepare(
+                    frame, camera.detection_scale, grayscale=camera.detector.grayscale
+                )
+                for frame in frames
+            ]
+            results = [
+                remap(found, camera.detection_scale)
+                for found, _ in camera.detector.detect_batch(images)
+            ]
+            camera.stats["detect"] += len(frames)
+        elapsed = time.perf_counter() - begin
+        for found in results:
+            latencies.append(elapsed / len(results))
+            detected += bool(len(found))
+            rects += len(found)
+        frames = []
+        if not ret:
+            break
+    cap.release()
+    stats = dict(camera.stats)
+    del camera
+    return {
+        "latencies": latencies,
+        "detected": detected,
+        "rects": rects,
+        "stats": stats,
+    }
+
+
+def benchmark(video, settings, workers=1, batch=1):
+    """
+    Benchmarks one detector configuration over a whole video, optionally splitting the video into frame ranges
+    processed by several worker processes.
+
+    :param video: Path to the video.
+    :type video: str
+    :param settings: Camera keyword arguments, with the detector given as a cascade file or DnnDetector keyword
+        arguments.
+    :type settings: dict
+    :param workers: Number of worker processes, defaults to 1.
+    :type workers: int, optional
+    :param batch: Frames handed to the detector at once, defaults to 1.
+    :type batch: int, optional
+
+    :return: Frames processed, frames per second, p50/p95/p99 latency in milliseconds, frames with a detection, total
+        rectangles and detection path counts.
+    :rtype: dict
+    """
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        logging.error(f"Failure to open {video}.")
+        raise RuntimeError(f"Failure to open {video}.")
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    bounds = np.linspace(0, frames, workers + 1).astype(int)
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    begin = time.perf_counter()
+    if 1 == workers:
+        results = [_run(video, start, stop, settings, batch) for start, stop in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run, video, int(start), int(stop), settings, batch)
+                for start, stop in ranges
+            ]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - begin
+
+    latencies = np.array([value for result in results for value in result["latencies"]])
+    stats = Counter()
+    for result in results:
+        stats.update(result["stats"])
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) * 1000 if len(latencies) else (0, 0, 0)
+    )
+    return {
+        "frames": len(latencies),
+        "fps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        "detected": sum(result["detected"] for result in results),
+        "rects": sum(result["rects"] for result in results),
+        "stats": dict(stats),
+    }
+
+
+def main():
+    data = os.path.join(os.path.dirname(__file__), "data")
+    parser = argparse.ArgumentParser(
+        prog="python -m btb.libcamera.benchmark",
+        description="Runs the detection pipeline over a recorded video and reports throughput, latency and detections.",
+    )
+    parser.add_argument("video", help="Recorded video to run detection over.")
+    parser.add_argument(
+        "--cascade",
+        nargs="+",
+        default=[
+            os.path.join(data, "haarcascade_frontalcatface.xml"),
+            os.path.join(data, "haarcascade_frontalcatface_extended.xml"),
+        ],
+        help="Cascade classifier xml files, each benchmarked separately.",
+    )
+    parser.add_argument(
+        "--model",
+        nargs="+",
+        default=[],
+        help="DNN model files (.onnx, .caffemodel), each benchmarked separately.",
+    )
+    parser.add_argument(
+        "--config", help="DNN model description file (.prototxt), if needed."
+    )
+    parser.add_argument(
+        "--input-size",
+        nargs=2,
+        type=int,
+        default=[300, 300],
+        help="DNN model input width and height.",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.5,
+        help="DNN minimum detection confidence.",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        help="Frames handed to the detector at once. Batches skip the motion gate and tracker.",
+    )
+    parser.add_argument(
+        "--scale", nargs="+", type=float, default=[1.0], help="Detection scales."
+    )
+    parser.add_argument(
+        "--scale-factor",
+        nargs="+",
+        type=float,
+        default=[1.1],
+        help="Cascade scale factors.",
+    )
+    parser.add_argument(
+        "--min-neighbors",
+        nargs="+",
+        type=int,
+        default=[3],
+        help="Cascade minimum neighbors.",
+    )
+    parser.add_argument(
+        "--motion-gate", action="store_true", help="Enable the motion gate."
+    )
+    parser.add_argument(
+        "--track", action="store_true", help="Enable tracking between detections."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes, each given a range of frames.",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    detectors = [(os.path.basename(cascade), cascade) for cascade in args.cascade]
+    detectors += [
+        (
+            os.path.basename(model),
+            {
+                "model": model,
+                "config": args.config,
+                "input_size": args.input_size,
+                "confidence": args.confidence,
+            },
+        )
+        for model in args.model
+    ]
+    print(
+        f"{'detector':<42} {'scale':>5} {'factor':>6} {'nbrs':>4} {'frames':>6} {'fps':>7} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'detected':>8} {'rects':>6}"
+    )
+    for (name, detector), scale, scale_factor, min_neighbors in itertools.product(
+        detectors, args.scale, args.scale_factor, args.min_neighbors
+    ):
+        result = benchmark(
+            args.video,
+            {
+                "detector": detector,
+                "detection_scale": scale,
+                "scale_factor": scale_factor,
+                "min_neighbors": min_neighbors,
+                "motion_gate": args.motion_gate,
+                "track": args.track,
+            },
+            args.workers,
+            args.batch,
+        )
+        print(
+            f"{name:<42} {scale:>5} {scale_factor:>6} {min_neighbors:>4} "
+            f"{result['frames']:>6} {result['fps']:>7.1f} {result['p50']:>7.2f} {result['p95']:>7.2f} "
+            f"{result['p99']:>7.2f} {result['detected']:>8} {result['rects']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
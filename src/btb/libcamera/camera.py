@@ -9,21 +9,37 @@
 """
 
 # From the Python Standard Library
+from collections import Counter
 from datetime import datetime
 import logging
 import os
+import time
 
 # From Open Computer Vision
 import cv2
 
+# From NumPy
+import numpy as np
+
+# From libcamera
+from .capture import FrameGrabber
+from .detectors import Detector, HaarDetector, empty
+from .ensemble import CascadeEnsemble
+from .governor import Governor
+from .motion import MotionGate
+from .preprocess import prepare, remap
+from .tracker import TemplateTracker
+from .recorder import ClipRecorder, Recorder
+
 
 class Camera:
     """
     Camera module for computer vision with several variable options.
 
-    :param input: Path to input if using a file. If using camera use 0.
+    :param input: Path to input if using a file. If using camera use 0. None to open no input and only detect on frames
+        passed to process().
     :type input: str
-    :param output: Path to output file generated with image detection rectangle overlay.
+    :param output: Path to output file generated with image detection rectangle overlay. When recording clips this is the directory clips are written to. None to record nothing.
     :type output: str
     :param resolution: Resolution to use for camera/ouput. (ex: 144, 240, 360, 720, 1080).
     :type resolution: int
@@ -31,12 +47,105 @@ class Camera:
     :type fps: int
     :param brightness: Brightness as a whole number percentage. (ex 50, 100, 15).
     :type brightness: int
-    :param detector: Cascade classifier detector xml file.
-    :type detector: str
+    :param detector: Detector backend, or a cascade classifier xml file, or a list of them to evaluate in parallel and merge by vote.
+    :type detector: Detector or str or list[str]
+    :param buffer_depth: Number of captured frames held while waiting for detection, defaults to 2.
+    :type buffer_depth: int, optional
+    :param frame_policy: "latest" to always detect on the newest frame, dropping stale ones, or "every" to detect on every captured frame, defaults to "latest".
+    :type frame_policy: str, optional
+    :param record_queue_size: Number of frames that may wait to be annotated and encoded, defaults to 32.
+    :type record_queue_size: int, optional
+    :param record_overflow: What to do when the recorder queue is full, one of "block", "drop_oldest" or "drop_newest", defaults to "drop_oldest".
+    :type record_overflow: str, optional
+    :param record_mode: "continuous" to record every frame to a single file or "clips" to record a clip per detection event, defaults to "continuous".
+    :type record_mode: str, optional
+    :param pre_roll: Seconds of frames kept in memory and written ahead of each clip, defaults to 5.
+    :type pre_roll: float, optional
+    :param post_roll: Seconds recorded after the last detection of a clip, defaults to 5.
+    :type post_roll: float, optional
+    :param max_clip_length: Seconds after which a clip is split into a new segment, defaults to 60.
+    :type max_clip_length: float, optional
+    :param max_clips: Number of clips kept on disk, defaults to 50.
+    :type max_clips: int, optional
+    :param detection_scale: Factor applied to the frame dimensions before detection runs on its equalized grayscale copy, defaults to 1.0.
+    :type detection_scale: float, optional
+    :param scale_factor: How much the cascade image size is reduced at each image scale, defaults to 1.1. Only used when detector is a cascade file.
+    :type scale_factor: float, optional
+    :param min_neighbors: How many neighbors each candidate rectangle needs to be kept, defaults to 3. Only used when detector is a cascade file.
+    :type min_neighbors: int, optional
+    :param min_size: Minimum (width, height) of a detection in captured frame pixels, defaults to no minimum.
+    :type min_size: tuple[int, int], optional
+    :param motion_gate: Only run detection on frames, and within the region of them, that changed, defaults to False.
+    :type motion_gate: bool, optional
+    :param motion_threshold: Minimum per pixel intensity change counted as motion, defaults to 25.
+    :type motion_threshold: int, optional
+    :param motion_min_area: Fraction of pixels that must change for detection to run, defaults to 0.002.
+    :type motion_min_area: float, optional
+    :param track: Follow a detection with a template tracker and only re-run the cascade periodically, defaults to False.
+    :type track: bool, optional
+    :param redetect_interval: Number of frames tracked before the cascade is re-run, defaults to 5.
+    :type redetect_interval: int, optional
+    :param track_min_confidence: Match confidence below which tracking is dropped and the cascade re-run, defaults to 0.6.
+    :type track_min_confidence: float, optional
+    :param vote_rule: How the results of several cascades are merged, one of "any", "majority" or "all", defaults to "majority".
+    :type vote_rule: str, optional
+    :param frame_bus: Name of a shared memory frame bus every captured frame is published to, so that other
+        consumers, including other processes, can read them without copies, defaults to no frame bus.
+    :type frame_bus: str, optional
+    :param frame_budget: Target detection time per captured frame in seconds. When set, the detection scale and frame
+        skip are adjusted at runtime to hold it, defaults to no adjustment.
+    :type frame_budget: float, optional
     """
 
-    def __init__(self, input, output, resolution, fps, brightness, detector):
-        self.cap = cv2.VideoCapture(input)
+    def __init__(
+        self,
+        input,
+        output,
+        resolution,
+        fps,
+        brightness,
+        detector,
+        buffer_depth=2,
+        frame_policy="latest",
+        record_queue_size=32,
+        record_overflow="drop_oldest",
+        record_mode="continuous",
+        pre_roll=5.0,
+        post_roll=5.0,
+        max_clip_length=60.0,
+        max_clips=50,
+        detection_scale=1.0,
+        scale_factor=1.1,
+        min_neighbors=3,
+        min_size=None,
+        motion_gate=False,
+        motion_threshold=25,
+        motion_min_area=0.002,
+        track=False,
+        redetect_interval=5,
+        track_min_confidence=0.6,
+        vote_rule="majority",
+        frame_bus=None,
+        frame_budget=None,
+    ):
+        self.input = input
+        # The ensemble starts its worker processes here, before the capture
+        # and recorder threads exist.
+        if isinstance(detector, Detector):
+            self.detector = detector
+        elif isinstance(detector, (list, tuple)):
+            self.detector = CascadeEnsemble(
+                detector,
+                vote_rule,
+                scale_factor=scale_factor,
+                min_neighbors=min_neighbors,
+            )
+        else:
+            self.detector = HaarDetector(detector, scale_factor, min_neighbors)
+        if input is None:
+            self.cap = None
+        else:
+            self.cap = cv2.VideoCapture(input)
         if 0 == input:
             os.system("v4l2-ctl --set-ctrl=rotate=90")
         if resolution:
@@ -46,81 +155,306 @@ class Camera:
             self.resolution = resolution
             frame_width = int(resolution * 4 / 3)
             frame_height = int(resolution)
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, frame_width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, frame_height)
-        else:
+            if self.cap is not None:
+                self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, frame_width)
+                self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, frame_height)
+        elif self.cap is not None:
             frame_width = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
             frame_height = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        else:
+            frame_width = frame_height = None
         logging.debug(
             f"Frame resolution set to {str(frame_height)}, {str(frame_width)}."
         )
 
-        if fps:
-            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if self.cap is not None:
+            if fps:
+                self.cap.set(cv2.CAP_PROP_FPS, fps)
+            else:
+                fps = self.cap.get(cv2.CAP_PROP_FPS)
+            logging.debug(f"Frames per second set to {str(fps)}.")
+
+            if brightness:
+                self.cap.set(cv2.CAP_PROP_BRIGHTNESS, int(brightness))
+            else:
+                brightness = self.cap.get(cv2.CAP_PROP_BRIGHTNESS)
+            logging.debug(f"Brightness set to {str(brightness)}%.")
+
+        if output is None:
+            self.recorder = None
+        elif "continuous" == record_mode:
+            self.recorder = Recorder(
+                os.path.join(os.path.dirname(__file__), output),
+                fps,
+                (frame_width, frame_height),
+                record_queue_size,
+                record_overflow,
+            )
+        elif "clips" == record_mode:
+            self.recorder = ClipRecorder(
+                os.path.join(os.path.dirname(__file__), output),
+                fps,
+                (frame_width, frame_height),
+                record_queue_size,
+                record_overflow,
+                pre_roll,
+                post_roll,
+                max_clip_length,
+                max_clips,
+            )
+        else:
+            logging.error(f"Invalid record mode selected: {record_mode}")
+            raise ValueError(f"Invalid record mode selected: {record_mode}")
+        self.detection_scale = detection_scale
+        self.min_size = min_size
+        if motion_gate:
+            self.motion = MotionGate(motion_threshold, motion_min_area)
+        else:
+            self.motion = None
+        if track:
+            self.tracker = TemplateTracker(min_confidence=track_min_confidence)
+        else:
+            self.tracker = None
+        self.redetect_interval = redetect_interval
+        if frame_budget:
+            self.governor = Governor(frame_budget, scale=detection_scale)
         else:
-            fps = self.cap.get(cv2.CAP_PROP_FPS)
-        logging.debug(f"Frames per second set to {str(fps)}.")
+            self.governor = None
+        self.__tracked_frames = 0
+        self.rects, self.scores = empty()
+        self.__track_score = 0.0
+        # The detection path taken by the latest frame and the number of
+        # frames that went down each path.
+        self.path = None
+        self.stats = Counter()
 
-        if brightness:
-            self.cap.set(cv2.CAP_PROP_BRIGHTNESS, int(brightness))
+        if self.cap is None:
+            self.grabber = None
         else:
-            brightness = self.cap.get(cv2.CAP_PROP_BRIGHTNESS)
-        logging.debug(f"Brightness set to {str(brightness)}%.")
-
-        self.output = cv2.VideoWriter(
-            os.path.join(os.path.dirname(__file__), output),
-            cv2.VideoWriter_fourcc(*"mp4v"),
-            int(fps),
-            (int(frame_width), int(frame_height)),
-        )
-        self.detector = cv2.CascadeClassifier(detector)
+            self.grabber = FrameGrabber(self.cap, buffer_depth, frame_policy, frame_bus)
+            self.grabber.start()
 
     def __del__(self) -> None:
         """
-        Camera destructor. Releases the input and ouptut files.
+        Camera destructor. Stops the capture thread and releases the input and ouptut files.
 
         :return: None
         """
-        self.output.release()
-        self.cap.release()
+        if self.grabber is not None:
+            self.grabber.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.cap is not None:
+            self.cap.release()
+        self.detector.close()
 
     def coordinates(self):
         """
-        Finds image of interest within a frame returns the coordinates.
+        Finds image of interest within the next captured frame and returns the coordinates.
 
         :return: Coordinates of the image of interest.
+        :rtype: numpy.ndarray
         """
-        ret, frame = self.cap.read()
+        ret, frame = self.grabber.read()
         if not ret:
-            logging.error(f"Failure to open {input}.")
-            raise RuntimeError(f"Failure to open {input}.")
+            logging.error(f"Failure to open {self.input}.")
+            raise RuntimeError(f"Failure to open {self.input}.")
         else:
-            # adding filled rectangle on each frame
-            rects = self.detector.detectMultiScale(frame)
-            for (i, (x, y, w, h)) in enumerate(rects):
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-
-            font = cv2.FONT_HERSHEY_PLAIN
-            color = (255, 255, 255)
-            scale = 1
-            thickness = 1
-            origin = (10, self.resolution - 5)
-
-            # Add timestamp.
-            cv2.putText(
-                frame,
-                str(datetime.now()),
-                origin,
-                font,
-                scale,
-                color,
-                thickness,
-                cv2.LINE_AA,
+            return self.process(frame)
+
+    def process(self, frame, timestamp=None):
+        """
+        Finds image of interest within a frame, records the frame and returns the coordinates.
+
+        Detection runs on an equalized grayscale copy of the frame reduced by detection_scale, or a reduced color copy
+        for detectors that need color, and the resulting rectangles are mapped back to captured frame coordinates.
+        The motion gate and tracker work on the equalized grayscale copy. With the motion gate enabled, frames without
+        enough change are skipped and otherwise only the changed region is searched. The gate is bypassed while the
+        previous frame had a detection so that a subject that stops moving is not lost. With tracking enabled, a
+        detection is followed by the tracker and the cascade only re-runs every redetect_interval frames or when the
+        match weakens.
+        A tracked rectangle scores the detection's score scaled by the match confidence.
+        With a frame budget set, frames the governor skips return the previous frame's coordinates, held rather than
+        detected, which path reports as "skipped".
+
+        :param frame: Captured BGR frame. Handed to the recorder, so it must not be modified afterwards.
+        :type frame: numpy.ndarray
+        :param timestamp: Time the frame was captured, defaults to now.
+        :type timestamp: datetime.datetime, optional
+
+        :return: Coordinates of the image of interest.
+        :rtype: numpy.ndarray
+        """
+        timestamp = timestamp or datetime.now()
+        if self.governor is not None and not self.governor.detect():
+            # Hold the previous result on skipped frames.
+            self.path = "skipped"
+            self.stats[self.path] += 1
+            self.__record(frame, self.rects, timestamp)
+            return self.rects
+
+        start = time.perf_counter()
+        # Prepared once per frame and cropped, so that a region searched
+        # sees the same pixels as the whole frame would.
+        if self.detector.grayscale:
+            image = source = prepare(frame, self.detection_scale)
+        else:
+            source = prepare(frame, self.detection_scale, grayscale=False)
+            image = prepare(source)
+        region = (0, 0, image.shape[1], image.shape[0])
+        if self.motion is not None:
+            changed = self.motion.region(image)
+            if not len(self.rects):
+                region = changed
+
+        tracked = None
+        if (
+            self.tracker is not None
+            and self.tracker.active
+            and self.__tracked_frames < self.redetect_interval
+        ):
+            tracked = self.tracker.update(image)
+
+        if tracked is not None:
+            self.path = "track"
+            self.__tracked_frames += 1
+            rects = remap((tracked,), self.detection_scale)
+            # Only as confident as both the detection and the match.
+            scores = np.array([self.__track_score * self.tracker.confidence])
+        elif region is None:
+            self.path = "gated"
+            self.motion.gated += 1
+            rects, scores = empty()
+        else:
+            self.path = "detect"
+            x, y, w, h = region
+            rects, scores = self.detect(source[y : y + h, x : x + w], (x, y))
+            if self.tracker is not None:
+                self.__start_tracking(image, rects, scores)
+        self.stats[self.path] += 1
+        self.rects = rects
+        self.scores = scores
+        # Only detections count, the governor accounts for cheaper frames
+        # through the frame skip.
+        if self.governor is not None and "detect" == self.path:
+            self.__govern(time.perf_counter() - start)
+
+        self.__record(frame, rects, timestamp)
+        return rects
+
+    def detect(self, image, offset=(0, 0)):
+        """
+        Runs the detector on a prepared detection image.
+
+        :param image: Image at detection scale, grayscale unless the detector needs color.
+        :type image: numpy.ndarray
+        :param offset: (x, y) of the image within the scaled frame when a region was cropped, defaults to (0, 0).
+        :type offset: tuple[int, int], optional
+
+        :return: Tuple of the rectangles in captured frame coordinates and their scores.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        min_size = None
+        if self.min_size:
+            min_size = (
+                max(1, int(self.min_size[0] * self.detection_scale)),
+                max(1, int(self.min_size[1] * self.detection_scale)),
             )
+        rects, scores = self.detector.detect(image, min_size)
+        return remap(rects, self.detection_scale, offset), scores
 
-            # writing the new frame in output
-            self.output.write(frame)
-            return rects
+    @property
+    def scale_factor(self) -> float:
+        """
+        How much the cascade image size is reduced at each image scale, None if the detector is not a cascade.
+
+        :return: Scale factor.
+        :rtype: float
+        """
+        return getattr(self.detector, "scale_factor", None)
+
+    @scale_factor.setter
+    def scale_factor(self, value) -> None:
+        self.detector.scale_factor = value
+
+    @property
+    def min_neighbors(self) -> int:
+        """
+        How many neighbors each candidate rectangle needs to be kept, None if the detector is not a cascade.
+
+        :return: Minimum neighbors.
+        :rtype: int
+        """
+        return getattr(self.detector, "min_neighbors", None)
+
+    @min_neighbors.setter
+    def min_neighbors(self, value) -> None:
+        self.detector.min_neighbors = value
+
+    def __record(self, frame, rects, timestamp) -> None:
+        """
+        Hands a frame to the recorder, if recording. Annotation and encoding happen on the recorder thread.
+
+        :param frame: Captured frame.
+        :type frame: numpy.ndarray
+        :param rects: Detection rectangles to draw on the frame.
+        :type rects: numpy.ndarray
+        :param timestamp: Time the frame was captured.
+        :type timestamp: datetime.datetime
+
+        :return: None
+        """
+        if self.recorder is not None:
+            self.recorder.submit(frame, rects, timestamp)
+
+    def __govern(self, latency) -> None:
+        """
+        Reports a detected frame's time to the governor and applies any change in detection scale.
+
+        :param latency: Seconds spent on detection for the frame.
+        :type latency: float
+
+        :return: None
+        """
+        if self.governor.update(latency):
+            self.detection_scale = self.governor.scale
+            # The tracker's template was taken at the previous scale.
+            if self.tracker is not None:
+                self.tracker.stop()
+
+    def __start_tracking(self, image, rects, scores) -> None:
+        """
+        Starts tracking the largest of the detected rectangles, or stops tracking if there are none.
+
+        :param image: Detection scale image the rectangles were found on.
+        :type image: numpy.ndarray
+        :param rects: Detected rectangles in captured frame coordinates.
+        :type rects: numpy.ndarray
+        :param scores: Scores of the detected rectangles.
+        :type scores: numpy.ndarray
+
+        :return: None
+        """
+        self.__tracked_frames = 0
+        if not len(rects):
+            self.tracker.stop()
+            return
+        index = int(np.argmax(rects[:, 2] * rects[:, 3]))
+        largest = rects[index]
+        self.__track_score = float(scores[index])
+        self.tracker.start(
+            image, [int(value * self.detection_scale) for value in largest]
+        )
+
+    @property
+    def gated_frames(self) -> int:
+        """
+        Number of frames the motion gate skipped detection on.
+
+        :return: Gated frame count.
+        :rtype: int
+        """
+        return self.stats["gated"]
 
     def present(self) -> bool:
         """
@@ -129,12 +463,24 @@ class Camera:
         :return: True if a the image of interest was detected or not.
         :rtype: bool
         """
-        if () != self.coordinates():
+        if len(self.coordinates()):
             logging.debug(f"Image detected at {datetime.now()}!")
             return True
         else:
             return False
 
+    @property
+    def dropped_frames(self) -> int:
+        """
+        Number of captured frames that were discarded as stale before detection ran on them.
+
+        :return: Dropped frame count.
+        :rtype: int
+        """
+        if self.grabber is None:
+            return 0
+        return self.grabber.dropped
+
 
 if __name__ == "__main__":
     raise Exception("This module is not an entry point!")
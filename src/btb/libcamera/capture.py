@@ -0,0 +1,200 @@
+"""
+.. module:: capture
+   :platform: Unix, Windows
+   :synopsis: Background frame capture with a bounded ring buffer.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Background frame capture with a bounded ring buffer.
+"""
+
+# From the Python Standard Library
+from collections import deque
+import logging
+import threading
+
+# From libcamera
+from .framebus import FrameBus
+
+
+class FrameGrabber:
+    """
+    Continuously pulls frames from a capture device on a dedicated thread and keeps the most recent ones in a small
+    ring buffer so that a slow consumer never causes the device buffer to back up.
+
+    Two policies are supported:\n
+    1. latest - Readers always receive the newest frame. Any older frames still waiting in the buffer are dropped.
+    2. every - Readers receive frames in capture order. The capture thread waits for room in the buffer rather than
+       dropping frames, so every frame is eventually seen.
+
+    :param cap: An opened capture device, e.g. a cv2.VideoCapture.
+    :type cap: cv2.VideoCapture
+    :param depth: Number of frames held in the ring buffer, defaults to 2.
+    :type depth: int, optional
+    :param policy: Either "latest" or "every", defaults to "latest".
+    :type policy: str, optional
+    :param bus_name: Also publish every captured frame to a shared memory frame bus of this name, created by start()
+        from the first frame, defaults to no frame bus.
+    :type bus_name: str, optional
+    :param bus_slots: Number of frame slots in the frame bus, defaults to 4.
+    :type bus_slots: int, optional
+    """
+
+    POLICIES = ("latest", "every")
+
+    def __init__(self, cap, depth=2, policy="latest", bus_name=None, bus_slots=4):
+        """
+        Constructor method.
+        """
+        if policy not in self.POLICIES:
+            logging.error(f"Invalid frame policy selected: {policy}")
+            raise ValueError(f"Invalid frame policy selected: {policy}")
+        if depth < 1:
+            logging.error(f"Invalid frame buffer depth selected: {depth}")
+            raise ValueError(f"Invalid frame buffer depth selected: {depth}")
+        self.cap = cap
+        self.depth = depth
+        self.policy = policy
+        self.captured = 0
+        self.dropped = 0
+        self.bus = None
+        self.bus_name = bus_name
+        self.bus_slots = bus_slots
+        self.__frames = deque(maxlen=depth)
+        self.__condition = threading.Condition()
+        self.__running = False
+        self.__eof = False
+        self.__error = None
+        self.__thread = None
+        logging.debug(f"Frame grabber created, depth: {depth}, policy: {policy}")
+
+    def start(self) -> None:
+        """
+        Starts the capture thread. With a frame bus, the first frame is read here to size the bus, so that failing to
+        create it, e.g. as another process holds the name, raises to the caller.
+
+        :return: None
+        """
+        if self.__running:
+            return
+        self.__eof = False
+        self.__error = None
+        if self.bus_name is not None and self.bus is None:
+            ret, frame = self.cap.read()
+            if ret:
+                try:
+                    self.bus = FrameBus(frame.shape, self.bus_slots, self.bus_name)
+                except FileExistsError:
+                    logging.error(f"Frame bus {self.bus_name} already exists.")
+                    raise
+                self.bus.publish(frame)
+                self.__frames.append(frame)
+                self.captured += 1
+        self.__running = True
+        self.__thread = threading.Thread(
+            target=self.__capture, name="btb-capture", daemon=True
+        )
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the capture thread and waits for it to exit.
+
+        :return: None
+        """
+        with self.__condition:
+            self.__running = False
+            self.__condition.notify_all()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+    def read(self, timeout=None):
+        """
+        Returns the next frame according to the selected policy, waiting for one to be captured if the buffer is empty.
+        Once the buffered frames are used up, an exception that ended the capture thread is raised here.
+
+        :param timeout: Maximum number of seconds to wait for a frame, defaults to waiting forever.
+        :type timeout: float, optional
+
+        :return: Tuple of a success flag and the frame, mirroring cv2.VideoCapture.read.
+        :rtype: tuple[bool, numpy.ndarray]
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(
+                lambda: self.__frames or self.__eof or not self.__running, timeout
+            ):
+                return False, None
+            if not self.__frames:
+                if self.__error is not None:
+                    raise self.__error
+                return False, None
+            if "latest" == self.policy:
+                frame = self.__frames.pop()
+                self.dropped += len(self.__frames)
+                self.__frames.clear()
+            else:
+                frame = self.__frames.popleft()
+            self.__condition.notify_all()
+            return True, frame
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of frames currently waiting in the ring buffer.
+
+        :return: Buffered frame count.
+        :rtype: int
+        """
+        return len(self.__frames)
+
+    def __capture(self) -> None:
+        """
+        Capture thread body. Reads frames until stopped, the input is exhausted or an error occurs. However it exits,
+        readers are woken and see the end of the input.
+
+        :return: None
+        """
+        try:
+            self.__loop()
+        except Exception as error:
+            logging.error(f"Frame grabber failed: {error}")
+            self.__error = error
+        finally:
+            with self.__condition:
+                self.__eof = True
+                self.__condition.notify_all()
+
+    def __loop(self) -> None:
+        """
+        Reads frames into the ring buffer until stopped or the input is exhausted.
+
+        :return: None
+        """
+        while self.__running:
+            ret, frame = self.cap.read()
+            if ret and self.bus_name is not None:
+                if self.bus is None:
+                    self.bus = FrameBus(frame.shape, self.bus_slots, self.bus_name)
+                self.bus.publish(frame)
+            with self.__condition:
+                if not ret:
+                    logging.warning("Frame grabber reached the end of its input.")
+                    return
+                if "every" == self.policy:
+                    self.__condition.wait_for(
+                        lambda: len(self.__frames) < self.depth or not self.__running
+                    )
+                elif len(self.__frames) == self.depth:
+                    # The deque evicts the oldest frame on append.
+                    self.dropped += 1
+                self.__frames.append(frame)
+                self.captured += 1
+                self.__condition.notify_all()
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
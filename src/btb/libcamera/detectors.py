@@ -0,0 +1,243 @@
+"""
+.. module:: detectors
+   :platform: Unix, Windows
+   :synopsis: Interchangeable object detector backends.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Interchangeable object detector backends returning rectangles with confidence scores.
+"""
+
+# From the Python Standard Library
+import abc
+import logging
+
+# From Open Computer Vision
+import cv2
+
+# From NumPy
+import numpy as np
+
+
+def empty():
+    """
+    Returns an empty detection result.
+
+    :return: Tuple of an empty N by 4 integer array of rectangles and an empty array of scores.
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    return np.empty((0, 4), dtype=int), np.empty((0,), dtype=float)
+
+
+class Detector(abc.ABC):
+    """
+    Abstract base class for detector backends used by Camera. Backends implement detect().
+
+    Every backend returns its detections in the same format, an N by 4 integer array of (x, y, w, h) rectangles on
+    the image it was given and an array of N confidence scores, higher meaning more confident. The range of the
+    scores depends on the backend.
+
+    Backends that need a color image set grayscale to False and are given BGR images, otherwise they are given
+    equalized grayscale images.
+    """
+
+    grayscale = True
+
+    @abc.abstractmethod
+    def detect(self, image, min_size=None):
+        """
+        Finds objects on an image.
+
+        :param image: Image to search.
+        :type image: numpy.ndarray
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+
+    def detect_batch(self, images, min_size=None):
+        """
+        Finds objects on several images. Backends that can evaluate images together override this. Camera detects one
+        frame at a time, as its motion gate and tracker decide per frame whether to detect at all, so batches are only
+        formed offline, by the benchmark.
+
+        :param images: Images to search.
+        :type images: list[numpy.ndarray]
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores for each image.
+        :rtype: list[tuple[numpy.ndarray, numpy.ndarray]]
+        """
+        return [self.detect(image, min_size) for image in images]
+
+    def close(self) -> None:
+        """
+        Releases any resources held by the detector.
+
+        :return: None
+        """
+
+
+class HaarDetector(Detector):
+    """
+    Haar cascade classifier backend. Scores are the cascade's level weights.
+
+    :param path: Cascade classifier xml file.
+    :type path: str
+    :param scale_factor: How much the image size is reduced at each image scale, defaults to 1.1.
+    :type scale_factor: float, optional
+    :param min_neighbors: How many neighbors each candidate rectangle needs to be kept, defaults to 3.
+    :type min_neighbors: int, optional
+    """
+
+    def __init__(self, path, scale_factor=1.1, min_neighbors=3):
+        """
+        Constructor method.
+        """
+        self.path = path
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.cascade = cv2.CascadeClassifier(path)
+        if self.cascade.empty():
+            logging.error(f"Failure to load cascade classifier {path}.")
+            raise RuntimeError(f"Failure to load cascade classifier {path}.")
+
+    def detect(self, image, min_size=None):
+        """
+        Finds objects on a grayscale image.
+
+        :param image: Image to search.
+        :type image: numpy.ndarray
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        rects, _, weights = self.cascade.detectMultiScale3(
+            image,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=min_size or (0, 0),
+            outputRejectLevels=True,
+        )
+        if not len(rects):
+            return empty()
+        return (
+            np.asarray(rects, dtype=int).reshape(-1, 4),
+            np.asarray(weights, dtype=float).reshape(-1),
+        )
+
+
+class DnnDetector(Detector):
+    """
+    Deep neural network backend running a local model on the CPU with cv2.dnn. The model must produce SSD style
+    detections, rows of (image, class, confidence, left, top, right, bottom) with coordinates relative to the image
+    size, as Caffe and ONNX exports of SSD detectors do. Scores are the model's confidences, from zero to one.
+
+    :param model: Model weights file, e.g. .onnx or .caffemodel.
+    :type model: str
+    :param config: Model description file, e.g. .prototxt, if the format needs one, defaults to None.
+    :type config: str, optional
+    :param input_size: (width, height) the model expects, defaults to (300, 300).
+    :type input_size: tuple[int, int], optional
+    :param scale: Multiplier applied to pixel values, defaults to 1.0.
+    :type scale: float, optional
+    :param mean: BGR mean subtracted from pixel values, defaults to (104, 177, 123).
+    :type mean: tuple[float, float, float], optional
+    :param swap_rb: Feed the model RGB rather than BGR images, defaults to False.
+    :type swap_rb: bool, optional
+    :param confidence: Minimum confidence of a detection, defaults to 0.5.
+    :type confidence: float, optional
+    :param class_ids: Model classes kept, defaults to all classes.
+    :type class_ids: list[int], optional
+    """
+
+    grayscale = False
+
+    def __init__(
+        self,
+        model,
+        config=None,
+        input_size=(300, 300),
+        scale=1.0,
+        mean=(104.0, 177.0, 123.0),
+        swap_rb=False,
+        confidence=0.5,
+        class_ids=None,
+    ):
+        """
+        Constructor method.
+        """
+        self.model = model
+        self.input_size = tuple(input_size)
+        self.scale = scale
+        self.mean = mean
+        self.swap_rb = swap_rb
+        self.confidence = confidence
+        self.class_ids = None if class_ids is None else set(class_ids)
+        self.net = cv2.dnn.readNet(model, config or "")
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        logging.info(f"DNN detector loaded {model}.")
+
+    def detect(self, image, min_size=None):
+        """
+        Finds objects on a BGR image.
+
+        :param image: Image to search.
+        :type image: numpy.ndarray
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        return self.detect_batch([image], min_size)[0]
+
+    def detect_batch(self, images, min_size=None):
+        """
+        Finds objects on several BGR images with a single forward pass.
+
+        :param images: Images to search.
+        :type images: list[numpy.ndarray]
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores for each image.
+        :rtype: list[tuple[numpy.ndarray, numpy.ndarray]]
+        """
+        if not images:
+            return []
+        blob = cv2.dnn.blobFromImages(
+            images, self.scale, self.input_size, self.mean, self.swap_rb, crop=False
+        )
+        self.net.setInput(blob)
+        rows = self.net.forward().reshape(-1, 7)
+        rows = rows[rows[:, 2] >= self.confidence]
+        if self.class_ids is not None:
+            rows = rows[[int(row[1]) in self.class_ids for row in rows]]
+
+        results = []
+        for index, image in enumerate(images):
+            found = rows[rows[:, 0] == index]
+            height, width = image.shape[:2]
+            x0 = np.clip(found[:, 3] * width, 0, width)
+            y0 = np.clip(found[:, 4] * height, 0, height)
+            x1 = np.clip(found[:, 5] * width, 0, width)
+            y1 = np.clip(found[:, 6] * height, 0, height)
+            rects = np.stack([x0, y0, x1 - x0, y1 - y0], axis=1).astype(int)
+            scores = found[:, 2].astype(float)
+            if min_size:
+                keep = (rects[:, 2] >= min_size[0]) & (rects[:, 3] >= min_size[1])
+                rects = rects[keep]
+                scores = scores[keep]
+            results.append((rects.reshape(-1, 4), scores))
+        return results
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
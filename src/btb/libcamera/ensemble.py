@@ -0,0 +1,271 @@
+"""
+.. module:: ensemble
+   :platform: Unix, Windows
+   :synopsis: Parallel evaluation of several cascade classifiers.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Parallel evaluation of several cascade classifiers with a voting merge.
+"""
+
+# From the Python Standard Library
+from concurrent.futures import ProcessPoolExecutor
+import logging
+from multiprocessing import resource_tracker, shared_memory
+import os
+
+# From NumPy
+import numpy as np
+
+# From libcamera
+from .detectors import Detector, HaarDetector
+
+# Detectors loaded by each worker process.
+_detectors = []
+
+# Shared memory segment each worker process is attached to, keyed by name.
+_segments = {}
+
+
+def _load(paths) -> None:
+    """
+    Worker process initializer. Loads every cascade once per process.
+
+    :param paths: Cascade classifier xml files.
+    :type paths: list[str]
+
+    :return: None
+    """
+    global _detectors
+    _detectors = [HaarDetector(path) for path in paths]
+
+
+def _ready(_) -> int:
+    """
+    Worker process no-op used to start the pool ahead of time.
+
+    :return: Worker process id.
+    :rtype: int
+    """
+    return os.getpid()
+
+
+def _detect(index, name, shape, min_size, scale_factor, min_neighbors):
+    """
+    Worker process task. Runs one cascade over the image held in a shared memory segment.
+
+    :param index: Index of the cascade to run.
+    :type index: int
+    :param name: Name of the shared memory segment holding the image.
+    :type name: str
+    :param shape: Shape of the image.
+    :type shape: tuple[int, int]
+    :param min_size: Minimum (width, height) of a detection in image pixels.
+    :type min_size: tuple[int, int]
+    :param scale_factor: How much the image size is reduced at each image scale.
+    :type scale_factor: float
+    :param min_neighbors: How many neighbors each candidate rectangle needs to be kept.
+    :type min_neighbors: int
+
+    :return: Tuple of the rectangles and their scores.
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    if name not in _segments:
+        for segment in _segments.values():
+            segment.close()
+        _segments.clear()
+        _segments[name] = shared_memory.SharedMemory(name=name)
+    image = np.ndarray(shape, dtype=np.uint8, buffer=_segments[name].buf)
+    detector = _detectors[index]
+    detector.scale_factor = scale_factor
+    detector.min_neighbors = min_neighbors
+    return detector.detect(image, min_size)
+
+
+def iou(a, b) -> float:
+    """
+    Returns the intersection over union of two rectangles.
+
+    :param a: First rectangle as (x, y, w, h).
+    :type a: tuple[int, int, int, int]
+    :param b: Second rectangle as (x, y, w, h).
+    :type b: tuple[int, int, int, int]
+
+    :return: Intersection over union, from zero to one.
+    :rtype: float
+    """
+    x0 = max(a[0], b[0])
+    y0 = max(a[1], b[1])
+    x1 = min(a[0] + a[2], b[0] + b[2])
+    y1 = min(a[1] + a[3], b[1] + b[3])
+    intersection = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    if union <= 0:
+        return 0.0
+    return intersection / union
+
+
+def vote(results, rule="majority", overlap=0.3):
+    """
+    Merges the rectangles found by several detectors on the same image.
+
+    A rectangle is kept when enough detectors found an overlapping rectangle. Overlapping survivors are reduced to
+    the largest one. A kept rectangle's score is the mean, over all detectors, of the best score each gave an
+    overlapping rectangle, counting zero for detectors that did not find it.\n
+    1. any - One detector is enough.
+    2. majority - More than half of the detectors must agree.
+    3. all - Every detector must agree.
+
+    :param results: Rectangles and their scores found by each detector.
+    :type results: list[tuple[numpy.ndarray, numpy.ndarray]]
+    :param rule: One of "any", "majority" or "all", defaults to "majority".
+    :type rule: str, optional
+    :param overlap: Intersection over union at which two rectangles are considered the same, defaults to 0.3.
+    :type overlap: float, optional
+
+    :return: Tuple of the merged rectangles and their scores.
+    :rtype: tuple[numpy.ndarray, numpy.ndarray]
+    """
+    required = {"any": 1, "majority": len(results) // 2 + 1, "all": len(results)}[rule]
+    candidates = [rect for rects, _ in results for rect in rects]
+    candidates.sort(key=lambda rect: rect[2] * rect[3], reverse=True)
+    kept = []
+    kept_scores = []
+    for rect in candidates:
+        if any(overlap <= iou(rect, other) for other in kept):
+            continue
+        best = [
+            max(
+                (
+                    score
+                    for other, score in zip(rects, scores)
+                    if overlap <= iou(rect, other)
+                ),
+                default=None,
+            )
+            for rects, scores in results
+        ]
+        voters = [score for score in best if score is not None]
+        if required <= len(voters):
+            kept.append(rect)
+            kept_scores.append(sum(voters) / len(results))
+    return (
+        np.asarray(kept, dtype=int).reshape(-1, 4),
+        np.asarray(kept_scores, dtype=float),
+    )
+
+
+class CascadeEnsemble(Detector):
+    """
+    Evaluates several cascade classifiers on the same image in parallel worker processes and merges their results.
+
+    Images are handed to the workers through a shared memory segment rather than being pickled. The worker pool is
+    started by the constructor, so construct the ensemble before starting any other threads.
+
+    :param paths: Cascade classifier xml files.
+    :type paths: list[str]
+    :param rule: Voting rule, one of "any", "majority" or "all", defaults to "majority".
+    :type rule: str, optional
+    :param overlap: Intersection over union at which two rectangles are considered the same, defaults to 0.3.
+    :type overlap: float, optional
+    :param workers: Number of worker processes, defaults to one per cascade up to the number of cores.
+    :type workers: int, optional
+    :param scale_factor: How much the image size is reduced at each image scale, defaults to 1.1.
+    :type scale_factor: float, optional
+    :param min_neighbors: How many neighbors each candidate rectangle needs to be kept, defaults to 3.
+    :type min_neighbors: int, optional
+    """
+
+    RULES = ("any", "majority", "all")
+
+    def __init__(
+        self,
+        paths,
+        rule="majority",
+        overlap=0.3,
+        workers=None,
+        scale_factor=1.1,
+        min_neighbors=3,
+    ):
+        """
+        Constructor method.
+        """
+        if rule not in self.RULES:
+            logging.error(f"Invalid voting rule selected: {rule}")
+            raise ValueError(f"Invalid voting rule selected: {rule}")
+        self.paths = list(paths)
+        self.rule = rule
+        self.overlap = overlap
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.workers = workers or max(1, min(len(self.paths), os.cpu_count() or 1))
+        self.__segment = None
+        # Workers must share this process's resource tracker, otherwise each
+        # one would try to clean up the shared memory segment when it exits.
+        resource_tracker.ensure_running()
+        self.__pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_load,
+            initargs=(self.paths,),
+        )
+        list(self.__pool.map(_ready, range(self.workers)))
+        logging.info(
+            f"Cascade ensemble created, cascades: {len(self.paths)}, workers: {self.workers}, rule: {rule}"
+        )
+
+    def detect(self, image, min_size=None):
+        """
+        Runs every cascade on a grayscale image and returns the merged rectangles and their scores.
+
+        :param image: Image to search.
+        :type image: numpy.ndarray
+        :param min_size: Minimum (width, height) of a detection in image pixels, defaults to no minimum.
+        :type min_size: tuple[int, int], optional
+
+        :return: Tuple of the rectangles and their scores.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if self.__segment is None or self.__segment.size < image.nbytes:
+            self.__release()
+            self.__segment = shared_memory.SharedMemory(
+                create=True, size=max(1, image.nbytes)
+            )
+        shared = np.ndarray(image.shape, dtype=np.uint8, buffer=self.__segment.buf)
+        shared[...] = image
+        futures = [
+            self.__pool.submit(
+                _detect,
+                index,
+                self.__segment.name,
+                image.shape,
+                min_size,
+                self.scale_factor,
+                self.min_neighbors,
+            )
+            for index in range(len(self.paths))
+        ]
+        return vote([future.result() for future in futures], self.rule, self.overlap)
+
+    def close(self) -> None:
+        """
+        Stops the worker processes and frees the shared memory segment.
+
+        :return: None
+        """
+        self.__pool.shutdown()
+        self.__release()
+
+    def __release(self) -> None:
+        """
+        Frees the shared memory segment.
+
+        :return: None
+        """
+        if self.__segment is not None:
+            self.__segment.close()
+            self.__segment.unlink()
+            self.__segment = None
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,248 @@
+"""
+.. module:: framebus
+   :platform: Unix, Windows
+   :synopsis: Shared memory frame bus with one producer and many consumers.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Shared memory frame bus with one producer and many consumers.
+"""
+
+# From the Python Standard Library
+import logging
+from multiprocessing import resource_tracker, shared_memory
+import time
+
+# From NumPy
+import numpy as np
+
+# Marks a shared memory segment as a frame bus.
+_MAGIC = 0x42544246
+
+# Header layout, as int64 fields: magic, slot count, height, width, channels,
+# latest sequence number, then the sequence number held by each slot.
+_MAGIC_FIELD = 0
+_SLOTS_FIELD = 1
+_SHAPE_FIELD = 2
+_LATEST_FIELD = 5
+_SLOT_FIELD = 6
+
+
+class FrameBus:
+    """
+    Publishes frames into a ring of preallocated shared memory slots so that any number of consumers, in this or
+    other processes, can read the latest frame without copying it.
+
+    Every published frame gets an increasing sequence number. A slot is only reused after every other slot has been
+    written, so a consumer has that many frame periods to use a frame before it is overwritten. Consumers can confirm
+    a frame was not overwritten while they used it with valid().
+
+    The producer creates the bus. Consumers attach to it by name with FrameBus.attach.
+
+    :param shape: Frame shape as (height, width, channels).
+    :type shape: tuple[int, int, int]
+    :param slots: Number of frame slots, defaults to 4.
+    :type slots: int, optional
+    :param name: Name of the shared memory segment, defaults to a generated name.
+    :type name: str, optional
+    """
+
+    def __init__(self, shape, slots=4, name=None, _segment=None):
+        """
+        Constructor method.
+        """
+        if _segment is None:
+            if len(shape) == 2:
+                shape = (shape[0], shape[1], 1)
+            if slots < 2:
+                logging.error(f"Invalid frame bus slot count selected: {slots}")
+                raise ValueError(f"Invalid frame bus slot count selected: {slots}")
+            header_size = (_SLOT_FIELD + slots) * 8
+            frame_size = int(np.prod(shape))
+            self.__segment = shared_memory.SharedMemory(
+                name=name, create=True, size=header_size + frame_size * slots
+            )
+            self.owner = True
+            self.__header = np.ndarray(
+                (_SLOT_FIELD + slots,), dtype=np.int64, buffer=self.__segment.buf
+            )
+            self.__header[:] = 0
+            self.__header[_MAGIC_FIELD] = _MAGIC
+            self.__header[_SLOTS_FIELD] = slots
+            self.__header[_SHAPE_FIELD : _SHAPE_FIELD + 3] = shape
+            self.__header[_SLOT_FIELD:] = -1
+            logging.info(
+                f"Frame bus created, name: {self.__segment.name}, shape: {shape}, slots: {slots}"
+            )
+        else:
+            self.__segment = _segment
+            self.owner = False
+            self.__header = np.ndarray(
+                (_SLOT_FIELD,), dtype=np.int64, buffer=self.__segment.buf
+            )
+            if _MAGIC != self.__header[_MAGIC_FIELD]:
+                logging.error(f"Not a frame bus: {self.__segment.name}")
+                raise ValueError(f"Not a frame bus: {self.__segment.name}")
+            slots = int(self.__header[_SLOTS_FIELD])
+            shape = tuple(
+                int(v) for v in self.__header[_SHAPE_FIELD : _SHAPE_FIELD + 3]
+            )
+            self.__header = np.ndarray(
+                (_SLOT_FIELD + slots,), dtype=np.int64, buffer=self.__segment.buf
+            )
+            logging.info(f"Attached to frame bus {self.__segment.name}.")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.__frames = np.ndarray(
+            (slots,) + self.shape,
+            dtype=np.uint8,
+            buffer=self.__segment.buf,
+            offset=(_SLOT_FIELD + slots) * 8,
+        )
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to a frame bus created by another FrameBus, possibly in another process.
+
+        :param name: Name of the frame bus.
+        :type name: str
+
+        :return: A consumer side frame bus.
+        :rtype: FrameBus
+        """
+        try:
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the segment with a
+            # resource tracker, which destroys it when the tracker exits.
+            # Processes started by the producer share its tracker and are
+            # harmless, but a tracker started just for this attachment would
+            # destroy the bus when this process exits.
+            private = getattr(resource_tracker._resource_tracker, "_fd", None) is None
+            segment = shared_memory.SharedMemory(name=name)
+            if private:
+                resource_tracker.unregister(segment._name, "shared_memory")
+        return cls(None, _segment=segment)
+
+    @property
+    def name(self) -> str:
+        """
+        Name consumers use to attach to this frame bus.
+
+        :return: Shared memory segment name.
+        :rtype: str
+        """
+        return self.__segment.name
+
+    @property
+    def sequence(self) -> int:
+        """
+        Sequence number of the latest published frame, zero if none has been published.
+
+        :return: Latest sequence number.
+        :rtype: int
+        """
+        return int(self.__header[_LATEST_FIELD])
+
+    def publish(self, frame) -> int:
+        """
+        Copies a frame into the next slot and makes it the latest frame. Only the producer may publish.
+
+        :param frame: Frame to publish, matching the bus shape.
+        :type frame: numpy.ndarray
+
+        :return: Sequence number of the published frame.
+        :rtype: int
+        """
+        seq = self.sequence + 1
+        slot = seq % self.slots
+        self.__header[_SLOT_FIELD + slot] = -1
+        self.__frames[slot].reshape(frame.shape)[...] = frame
+        self.__header[_SLOT_FIELD + slot] = seq
+        self.__header[_LATEST_FIELD] = seq
+        return seq
+
+    def latest(self):
+        """
+        Returns the latest frame without copying it.
+
+        :return: Tuple of the sequence number and a read only view of the frame, or (0, None) if nothing has been
+            published yet.
+        :rtype: tuple[int, numpy.ndarray]
+        """
+        seq = self.sequence
+        if not seq:
+            return 0, None
+        return seq, self.read(seq)
+
+    def read(self, seq):
+        """
+        Returns the frame with the given sequence number without copying it.
+
+        :param seq: Sequence number of the frame.
+        :type seq: int
+
+        :return: A read only view of the frame, or None if its slot has been reused.
+        :rtype: numpy.ndarray
+        """
+        slot = seq % self.slots
+        if seq != self.__header[_SLOT_FIELD + slot]:
+            return None
+        view = self.__frames[slot]
+        view.flags.writeable = False
+        return view
+
+    def valid(self, seq) -> bool:
+        """
+        Whether the frame with the given sequence number is still intact. Check after using a view to make sure the
+        producer did not overwrite it in the meantime.
+
+        :param seq: Sequence number of the frame.
+        :type seq: int
+
+        :return: True if the frame has not been overwritten, false otherwise.
+        :rtype: bool
+        """
+        return seq == self.__header[_SLOT_FIELD + seq % self.slots]
+
+    def wait(self, after=0, timeout=None, interval=0.001):
+        """
+        Waits for a frame newer than the given sequence number and returns it without copying it.
+
+        :param after: Sequence number of the last frame seen, defaults to 0.
+        :type after: int, optional
+        :param timeout: Maximum number of seconds to wait, defaults to waiting forever.
+        :type timeout: float, optional
+        :param interval: Seconds between checks, defaults to 0.001.
+        :type interval: float, optional
+
+        :return: Tuple of the sequence number and a read only view of the frame, or (0, None) on timeout.
+        :rtype: tuple[int, numpy.ndarray]
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.sequence <= after:
+            if deadline is not None and time.monotonic() > deadline:
+                return 0, None
+            time.sleep(interval)
+        return self.latest()
+
+    def close(self) -> None:
+        """
+        Detaches from the frame bus. The producer also destroys it. Any frame views still held must be released
+        first.
+
+        :return: None
+        """
+        if self.__segment is None:
+            return
+        self.__header = None
+        self.__frames = None
+        self.__segment.close()
+        if self.owner:
+            self.__segment.unlink()
+        self.__segment = None
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,190 @@
+"""
+.. module:: governor
+   :platform: Unix, Windows
+   :synopsis: Runtime adjustment of detection cost to hold a frame budget.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Runtime adjustment of detection cost to hold a frame budget.
+"""
+
+# From the Python Standard Library
+import logging
+import os
+import time
+
+
+class Governor:
+    """
+    Measures detection latency and CPU load and steps the detection scale and frame skip up or down to hold a target
+    frame budget.
+
+    The cost compared against the budget is the detection latency spread over the frames it covers, one detected and
+    skip skipped. When over budget the detection scale is lowered first and frames are only skipped once the smallest
+    scale is reached. When comfortably under budget, with one frame less skipped or at the next larger scale without
+    skipping, frame skipping is undone first and then the scale is raised again.
+
+    The load is the one minute load average per CPU, which includes detector worker processes and slows down with
+    thermal throttling, or where there is no load average this process's CPU time as a fraction of one core.
+
+    :param target: Target detection time per captured frame in seconds, defaults to 0.1.
+    :type target: float, optional
+    :param scales: Detection scales to step between, largest first, defaults to (1.0, 0.75, 0.5, 0.375, 0.25).
+    :type scales: tuple[float], optional
+    :param scale: Starting and largest detection scale, smaller scales are taken from scales, defaults to the largest
+        of scales.
+    :type scale: float, optional
+    :param max_skip: Maximum number of frames skipped between detections, defaults to 4.
+    :type max_skip: int, optional
+    :param max_load: Load above which the governor also steps down, defaults to 0.9.
+    :type max_load: float, optional
+    :param smoothing: Weight given to each new measurement in the running averages, defaults to 0.2.
+    :type smoothing: float, optional
+    :param cooldown: Number of measured frames to wait after an adjustment before the next one, defaults to 10.
+    :type cooldown: int, optional
+    """
+
+    def __init__(
+        self,
+        target=0.1,
+        scales=(1.0, 0.75, 0.5, 0.375, 0.25),
+        scale=None,
+        max_skip=4,
+        max_load=0.9,
+        smoothing=0.2,
+        cooldown=10,
+    ):
+        """
+        Constructor method.
+        """
+        self.target = target
+        # The starting scale is also the largest, the configured resolution
+        # is a ceiling the governor only steps down from and back up to.
+        if scale:
+            scales = {value for value in scales if value < scale} | {scale}
+        self.scales = sorted(set(scales), reverse=True)
+        self.max_skip = max_skip
+        self.max_load = max_load
+        self.smoothing = smoothing
+        self.cooldown = cooldown
+        self.level = 0
+        self.skip = 0
+        self.latency = None
+        self.load = 0.0
+        self.adjustments = 0
+        self.__frame = 0
+        self.__settle = cooldown
+        self.__cpu = time.process_time()
+        self.__wall = time.monotonic()
+        self.__cpus = os.cpu_count() or 1
+        logging.info(
+            f"Governor created, target: {target * 1000:.0f} ms, scale: {self.scale}"
+        )
+
+    @property
+    def scale(self) -> float:
+        """
+        Detection scale currently selected.
+
+        :return: Detection scale.
+        :rtype: float
+        """
+        return self.scales[self.level]
+
+    def detect(self) -> bool:
+        """
+        Whether detection should run on the next frame given the current frame skip. Call once per frame.
+
+        :return: True to run detection, false to skip the frame.
+        :rtype: bool
+        """
+        self.__frame += 1
+        return 0 == self.__frame % (self.skip + 1)
+
+    @property
+    def cost(self) -> float:
+        """
+        Smoothed detection latency spread over the frames each detection covers.
+
+        :return: Seconds per captured frame, None before the first measurement.
+        :rtype: float
+        """
+        if self.latency is None:
+            return None
+        return self.latency / (self.skip + 1)
+
+    def __measure_load(self) -> float:
+        """
+        Measures the load since the previous call.
+
+        :return: Load, None if no time has passed.
+        :rtype: float
+        """
+        cpu = time.process_time()
+        wall = time.monotonic()
+        elapsed = wall - self.__wall
+        process = (cpu - self.__cpu) / elapsed if elapsed > 0 else None
+        self.__cpu = cpu
+        self.__wall = wall
+        try:
+            return os.getloadavg()[0] / self.__cpus
+        except (AttributeError, OSError):
+            # No load average, e.g. on Windows.
+            return process
+
+    def update(self, latency) -> bool:
+        """
+        Records the time of a detection and adjusts the scale or frame skip if needed. Only call it for frames the
+        detector ran on, cheaper frames are accounted for by the frame skip.
+
+        :param latency: Seconds spent on detection for the frame.
+        :type latency: float
+
+        :return: True if the detection scale changed, false otherwise.
+        :rtype: bool
+        """
+        load = self.__measure_load()
+        if load is not None:
+            self.load += self.smoothing * (load - self.load)
+
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+
+        if self.__settle:
+            self.__settle -= 1
+            return False
+
+        scale = self.scale
+        if self.cost > self.target or self.load > self.max_load:
+            if self.level < len(self.scales) - 1:
+                self.level += 1
+            elif self.skip < self.max_skip:
+                self.skip += 1
+            else:
+                return False
+            reason = "over budget"
+        elif self.load < 0.8 * self.max_load:
+            # Only undo a step if the cost after it still leaves headroom.
+            if self.skip and self.latency / self.skip < 0.6 * self.target:
+                self.skip -= 1
+            elif not self.skip and self.level and self.latency < 0.6 * self.target:
+                self.level -= 1
+            else:
+                return False
+            reason = "under budget"
+        else:
+            return False
+
+        self.adjustments += 1
+        self.__settle = self.cooldown
+        logging.info(
+            f"Governor {reason}, latency: {self.latency * 1000:.1f} ms, cost: {self.cost * 1000:.1f} ms, "
+            f"load: {self.load:.0%}, scale: {self.scale}, frame skip: {self.skip}"
+        )
+        return scale != self.scale
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
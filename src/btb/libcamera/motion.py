@@ -0,0 +1,113 @@
+"""
+.. module:: motion
+   :platform: Unix, Windows
+   :synopsis: Cheap motion pre-filter used to skip detection on static scenes.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Cheap motion pre-filter used to skip detection on static scenes.
+"""
+
+# From the Python Standard Library
+import logging
+
+# From Open Computer Vision
+import cv2
+
+# From NumPy
+import numpy as np
+
+
+class MotionGate:
+    """
+    Compares each frame against a running average background at a very low resolution and reports the region that
+    changed, if enough of it did.
+
+    :param threshold: Minimum per pixel intensity change counted as motion, defaults to 25.
+    :type threshold: int, optional
+    :param min_area: Fraction of pixels that must change for the frame to pass, defaults to 0.002.
+    :type min_area: float, optional
+    :param downscale: Factor applied to the incoming image before comparison, defaults to 0.25.
+    :type downscale: float, optional
+    :param learning_rate: Weight given to each new frame in the running background, defaults to 0.1.
+    :type learning_rate: float, optional
+    :param padding: Fraction of the changed region's size added around it on every side, defaults to 0.25.
+    :type padding: float, optional
+
+    frames counts the images compared. gated counts the frames detection was actually skipped on, which the caller
+    records, as it may search a frame the gate rejected, e.g. to keep following a still subject.
+    """
+
+    def __init__(
+        self,
+        threshold=25,
+        min_area=0.002,
+        downscale=0.25,
+        learning_rate=0.1,
+        padding=0.25,
+    ):
+        """
+        Constructor method.
+        """
+        self.threshold = threshold
+        self.min_area = min_area
+        self.downscale = downscale
+        self.learning_rate = learning_rate
+        self.padding = padding
+        self.frames = 0
+        self.gated = 0
+        self.__background = None
+        logging.debug(
+            f"Motion gate created, threshold: {threshold}, minimum area: {min_area}"
+        )
+
+    def region(self, image):
+        """
+        Updates the background with an image and returns the padded bounding box of the pixels that changed.
+
+        :param image: Grayscale image.
+        :type image: numpy.ndarray
+
+        :return: (x, y, w, h) of the changed region in image coordinates, or None if too little changed.
+        :rtype: tuple[int, int, int, int]
+        """
+        self.frames += 1
+        small = cv2.resize(
+            image,
+            None,
+            fx=self.downscale,
+            fy=self.downscale,
+            interpolation=cv2.INTER_AREA,
+        )
+        small = cv2.blur(small, (3, 3))
+        if self.__background is None or self.__background.shape != small.shape:
+            # Nothing to compare against yet, let the frame through.
+            self.__background = small.astype(np.float32)
+            return (0, 0, image.shape[1], image.shape[0])
+
+        diff = cv2.absdiff(small, cv2.convertScaleAbs(self.__background))
+        cv2.accumulateWeighted(small, self.__background, self.learning_rate)
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        if cv2.countNonZero(mask) < self.min_area * mask.size:
+            return None
+
+        x, y, w, h = cv2.boundingRect(mask)
+        pad_x = w * self.padding
+        pad_y = h * self.padding
+        x0 = max(0, int((x - pad_x) / self.downscale))
+        y0 = max(0, int((y - pad_y) / self.downscale))
+        x1 = min(image.shape[1], int((x + w + pad_x) / self.downscale) + 1)
+        y1 = min(image.shape[0], int((y + h + pad_y) / self.downscale) + 1)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def reset(self) -> None:
+        """
+        Forgets the background so the next frame passes unconditionally.
+
+        :return: None
+        """
+        self.__background = None
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,74 @@
+"""
+.. module:: preprocess
+   :platform: Unix, Windows
+   :synopsis: Frame preparation for detection.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Frame preparation for detection and mapping of results back to the captured frame.
+"""
+
+# From Open Computer Vision
+import cv2
+
+# From NumPy
+import numpy as np
+
+
+def prepare(frame, scale=1.0, equalize=True, grayscale=True):
+    """
+    Converts a captured frame to the single channel, reduced resolution image the detectors run on.
+
+    :param frame: Captured BGR (or already grayscale) frame.
+    :type frame: numpy.ndarray
+    :param scale: Factor applied to both frame dimensions, defaults to 1.0.
+    :type scale: float, optional
+    :param equalize: Equalize the histogram of the result, defaults to True. Only applies to grayscale images.
+    :type equalize: bool, optional
+    :param grayscale: Convert the frame to grayscale, defaults to True.
+    :type grayscale: bool, optional
+
+    :return: Detection image.
+    :rtype: numpy.ndarray
+    """
+    if not grayscale:
+        if 1.0 == scale:
+            return frame
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if 3 == frame.ndim:
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    else:
+        image = frame
+    if 1.0 != scale:
+        image = cv2.resize(
+            image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+    if equalize:
+        image = cv2.equalizeHist(image)
+    return image
+
+
+def remap(rects, scale=1.0, offset=(0, 0)):
+    """
+    Maps rectangles found on a detection image back to captured frame coordinates.
+
+    :param rects: Rectangles as (x, y, w, h) on the detection image.
+    :type rects: numpy.ndarray
+    :param scale: Factor the detection image was scaled by, defaults to 1.0.
+    :type scale: float, optional
+    :param offset: (x, y) of the detection image within the scaled frame when a region was cropped, defaults to (0, 0).
+    :type offset: tuple[int, int], optional
+
+    :return: An N by 4 integer array of rectangles in captured frame coordinates.
+    :rtype: numpy.ndarray
+    """
+    if not len(rects):
+        return np.empty((0, 4), dtype=int)
+    rects = np.asarray(rects, dtype=float).reshape(-1, 4)
+    rects[:, 0] += offset[0]
+    rects[:, 1] += offset[1]
+    return np.rint(rects / scale).astype(int)
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
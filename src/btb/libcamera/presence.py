@@ -0,0 +1,204 @@
+"""
+.. module:: presence
+   :platform: Unix, Windows
+   :synopsis: Sliding window filter deciding whether the subject is present.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Confidence weighted sliding window filter deciding whether the subject is present from per frame
+    detections.
+"""
+
+# From the Python Standard Library
+import logging
+
+# From NumPy
+import numpy as np
+
+# From libcamera
+from .ensemble import iou
+
+
+class PresenceFilter:
+    """
+    Keeps the detection confidence of the most recent frames in a fixed size ring buffer and turns it into a presence
+    score, so that isolated spurious detections spread over a long time never add up to a decision.
+
+    Each frame's confidence comes from its best detection score: a frame with any detection counts at least
+    min_confidence, rising linearly to one as the score goes from zero to saturation, and frames without a detection
+    count zero. The floor matters as cascade level weights of detections that passed can be zero or negative. The
+    evidence for presence depends on the rule:
+
+    - k_of_n: the sum of the confidences over the window, i.e. roughly k confident frames out of the last n.
+    - decay: the sum of the confidences over the window with each frame's confidence multiplied by decay once per
+      frame since, so recent frames count more than old ones.
+    - overlap: as k_of_n, but a frame only counts if its best detection overlaps the previous frame's best detection,
+      which rejects detections jumping around the image.
+
+    The score is the evidence divided by required, clipped to one, and the subject is present when it reaches one.
+    Every update is constant time; the running sums are recomputed from the buffer once per pass over it to keep
+    rounding errors from accumulating.
+
+    :param window: Number of frames kept, defaults to 30.
+    :type window: int, optional
+    :param rule: Decision rule, one of "k_of_n", "decay" or "overlap", defaults to "k_of_n".
+    :type rule: str, optional
+    :param required: Evidence needed for presence, in fully confident frames, defaults to 10.0.
+    :type required: float, optional
+    :param saturation: Detection score at which a frame counts fully, defaults to 1.0.
+    :type saturation: float, optional
+    :param min_confidence: Confidence of a frame whose best detection scores zero or less, defaults to 0.5.
+    :type min_confidence: float, optional
+    :param decay: Per frame weight applied to older frames by the decay rule, defaults to 0.9.
+    :type decay: float, optional
+    :param overlap: Minimum intersection over union with the previous frame's detection for the overlap rule, defaults
+        to 0.3.
+    :type overlap: float, optional
+    """
+
+    RULES = ("k_of_n", "decay", "overlap")
+
+    def __init__(
+        self,
+        window=30,
+        rule="k_of_n",
+        required=10.0,
+        saturation=1.0,
+        decay=0.9,
+        overlap=0.3,
+        min_confidence=0.5,
+    ):
+        """
+        Constructor method.
+        """
+        if rule not in self.RULES:
+            logging.error(f"Invalid presence rule selected: {rule}")
+            raise ValueError(f"Invalid presence rule selected: {rule}")
+        # Evidence of a window full of fully confident frames.
+        if "decay" == rule:
+            maximum = float(np.sum(decay ** np.arange(window)))
+        else:
+            maximum = float(window)
+        if required > maximum:
+            logging.error(
+                f"Presence requires {required} evidence, a {window} frame window holds at most {maximum:.2f}."
+            )
+            raise ValueError(
+                f"Presence requires {required} evidence, a {window} frame window holds at most {maximum:.2f}."
+            )
+        self.window = window
+        self.rule = rule
+        self.required = required
+        self.saturation = saturation
+        self.min_confidence = min_confidence
+        self.decay = decay
+        self.overlap = overlap
+        self.frames = 0
+        self.__buffer = np.zeros(window, dtype=float)
+        # Weight of the oldest frame in the window under the decay rule.
+        self.__oldest = decay ** (window - 1)
+        self.reset()
+        logging.debug(
+            f"Presence filter created, rule: {rule}, window: {window}, required: {required}"
+        )
+
+    def reset(self) -> None:
+        """
+        Forgets all frames seen so far, e.g. after acting on a decision.
+
+        :return: None
+        """
+        self.__buffer[:] = 0.0
+        self.__index = 0
+        self.__evidence = 0.0
+        self.__previous = None
+
+    def update(self, rects, scores):
+        """
+        Adds a frame's detections to the window.
+
+        :param rects: Detected rectangles as (x, y, w, h).
+        :type rects: numpy.ndarray
+        :param scores: Scores of the detected rectangles.
+        :type scores: numpy.ndarray
+
+        :return: Presence score, from zero to one.
+        :rtype: float
+        """
+        self.frames += 1
+        confidence = 0.0
+        best = None
+        if len(rects):
+            index = int(np.argmax(scores))
+            best = rects[index]
+            strength = min(1.0, max(0.0, float(scores[index]) / self.saturation))
+            confidence = self.min_confidence + (1.0 - self.min_confidence) * strength
+        if "overlap" == self.rule:
+            if (
+                best is None
+                or self.__previous is None
+                or iou(best, self.__previous) < self.overlap
+            ):
+                confidence = 0.0
+            self.__previous = best
+
+        oldest = self.__buffer[self.__index]
+        self.__buffer[self.__index] = confidence
+        self.__index = (self.__index + 1) % self.window
+        if "decay" == self.rule:
+            self.__evidence = (
+                self.decay * (self.__evidence - self.__oldest * oldest) + confidence
+            )
+        else:
+            self.__evidence += confidence - oldest
+
+        if not self.__index:
+            self.__evidence = self.__sum()
+        return self.score
+
+    def __sum(self) -> float:
+        """
+        Computes the evidence over the whole buffer.
+
+        :return: Evidence.
+        :rtype: float
+        """
+        if "decay" != self.rule:
+            return float(self.__buffer.sum())
+        # Ages of the frames, zero being the newest.
+        ages = (self.__index - 1 - np.arange(self.window)) % self.window
+        return float(np.dot(self.__buffer, self.decay**ages))
+
+    @property
+    def evidence(self) -> float:
+        """
+        Evidence for presence over the window, in fully confident frames.
+
+        :return: Evidence.
+        :rtype: float
+        """
+        return max(0.0, float(self.__evidence))
+
+    @property
+    def score(self) -> float:
+        """
+        Fraction of the required evidence seen over the window.
+
+        :return: Presence score, from zero to one.
+        :rtype: float
+        """
+        return min(1.0, self.evidence / self.required)
+
+    @property
+    def present(self) -> bool:
+        """
+        Whether enough evidence has been seen for the subject to be present.
+
+        :return: True if present, false otherwise.
+        :rtype: bool
+        """
+        return self.evidence >= self.required
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,388 @@
+"""
+.. module:: recorder
+   :platform: Unix, Windows
+   :synopsis: Background annotation and encoding of camera frames.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Background annotation and encoding of camera frames.
+"""
+
+# From the Python Standard Library
+from collections import deque
+from datetime import datetime
+import glob
+import logging
+import os
+import queue
+import threading
+
+# From Open Computer Vision
+import cv2
+
+
+def annotate(frame, rects, timestamp) -> None:
+    """
+    Draws the detection rectangles and a timestamp onto a frame in place.
+
+    :param frame: Frame to draw on.
+    :type frame: numpy.ndarray
+    :param rects: Detection rectangles as (x, y, w, h).
+    :type rects: list
+    :param timestamp: Time the frame was captured.
+    :type timestamp: datetime.datetime
+
+    :return: None
+    """
+    for x, y, w, h in rects:
+        cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), (0, 0, 255), 2)
+
+    font = cv2.FONT_HERSHEY_PLAIN
+    color = (255, 255, 255)
+    scale = 1
+    thickness = 1
+    origin = (10, frame.shape[0] - 5)
+
+    # Add timestamp.
+    cv2.putText(
+        frame,
+        str(timestamp),
+        origin,
+        font,
+        scale,
+        color,
+        thickness,
+        cv2.LINE_AA,
+    )
+
+
+class Recorder:
+    """
+    Annotates and encodes frames on a worker thread fed by a bounded queue so that recording never stalls detection.
+
+    When the queue is full the overflow policy decides what happens to a newly submitted frame:\n
+    1. block - The caller waits for room in the queue.
+    2. drop_oldest - The oldest queued frame is discarded to make room.
+    3. drop_newest - The submitted frame is discarded.
+
+    :param output: Path to the output video file.
+    :type output: str
+    :param fps: Frames per second of the output video.
+    :type fps: int
+    :param size: Frame (width, height) of the output video.
+    :type size: tuple[int, int]
+    :param queue_size: Maximum number of frames waiting to be encoded, defaults to 32.
+    :type queue_size: int, optional
+    :param overflow: Overflow policy, one of "block", "drop_oldest" or "drop_newest", defaults to "drop_oldest".
+    :type overflow: str, optional
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(self, output, fps, size, queue_size=32, overflow="drop_oldest"):
+        """
+        Constructor method.
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            logging.error(f"Invalid recorder overflow policy selected: {overflow}")
+            raise ValueError(f"Invalid recorder overflow policy selected: {overflow}")
+        self.output = output
+        self.fps = int(fps)
+        self.size = (int(size[0]), int(size[1]))
+        self.overflow = overflow
+        self.encoded = 0
+        self.dropped = 0
+        self.__lock = threading.Lock()
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.writer = None
+        self.__thread = threading.Thread(
+            target=self.__work, name="btb-recorder", daemon=True
+        )
+        self.__thread.start()
+        logging.debug(
+            f"Recorder created, output: {output}, queue size: {queue_size}, overflow: {overflow}"
+        )
+
+    def submit(self, frame, rects, timestamp=None) -> bool:
+        """
+        Queues a frame to be annotated and encoded. The frame must not be modified by the caller afterwards.
+
+        :param frame: Frame to record.
+        :type frame: numpy.ndarray
+        :param rects: Detection rectangles to draw on the frame.
+        :type rects: list
+        :param timestamp: Time the frame was captured, defaults to now.
+        :type timestamp: datetime.datetime, optional
+
+        :return: True if the frame was queued, false if it was dropped.
+        :rtype: bool
+        """
+        item = (frame, rects, timestamp or datetime.now())
+        if "block" == self.overflow:
+            self.__queue.put(item)
+            return True
+        while True:
+            try:
+                self.__queue.put_nowait(item)
+                return True
+            except queue.Full:
+                if "drop_newest" == self.overflow:
+                    self.__count_drop()
+                    return False
+            try:
+                self.__queue.get_nowait()
+                self.__queue.task_done()
+                self.__count_drop()
+            except queue.Empty:
+                pass
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of frames waiting to be encoded.
+
+        :return: Queued frame count.
+        :rtype: int
+        """
+        return self.__queue.qsize()
+
+    def close(self) -> None:
+        """
+        Encodes any frames still queued, stops the worker thread and releases the output file.
+
+        :return: None
+        """
+        if self.__thread is None:
+            return
+        self.__queue.put(None)
+        self.__thread.join()
+        self.__thread = None
+        self._close_writer()
+        logging.info(
+            f"Recorder closed, {self.encoded} frames encoded, {self.dropped} frames dropped."
+        )
+
+    def _open_writer(self, path):
+        """
+        Opens a video writer for the given path using this recorder's frame rate and size.
+
+        :param path: Path to the output video file.
+        :type path: str
+
+        :return: The opened video writer.
+        :rtype: cv2.VideoWriter
+        """
+        return cv2.VideoWriter(
+            path,
+            cv2.VideoWriter_fourcc(*"mp4v"),
+            self.fps,
+            self.size,
+        )
+
+    def _close_writer(self) -> None:
+        """
+        Releases the current video writer.
+
+        :return: None
+        """
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def _record(self, frame, rects, timestamp) -> None:
+        """
+        Annotates and encodes a single frame. Runs on the worker thread.
+
+        :param frame: Frame to record.
+        :type frame: numpy.ndarray
+        :param rects: Detection rectangles to draw on the frame.
+        :type rects: list
+        :param timestamp: Time the frame was captured.
+        :type timestamp: datetime.datetime
+
+        :return: None
+        """
+        if self.writer is None:
+            self.writer = self._open_writer(self.output)
+        annotate(frame, rects, timestamp)
+        self.writer.write(frame)
+        self.encoded += 1
+
+    def __count_drop(self) -> None:
+        """
+        Increments the dropped frame counter.
+
+        :return: None
+        """
+        with self.__lock:
+            self.dropped += 1
+
+    def __work(self) -> None:
+        """
+        Worker thread body. Records queued frames until a None sentinel is received.
+
+        :return: None
+        """
+        while True:
+            item = self.__queue.get()
+            try:
+                if item is None:
+                    return
+                self._record(*item)
+            except Exception:
+                logging.exception("Recorder failed to encode a frame.")
+            finally:
+                self.__queue.task_done()
+
+
+class ClipRecorder(Recorder):
+    """
+    Records a separate, timestamped clip for each detection event instead of one continuous file.
+
+    The last few seconds of frames are held in memory. When a frame arrives with detection rectangles, a new clip is
+    opened, the held frames are written first and recording continues until no detection has been seen for the
+    post-roll period. Long events are split into segments and only the newest clips are kept on disk.
+
+    :param output: Directory clips are written to. Created if it does not exist.
+    :type output: str
+    :param fps: Frames per second of the output video.
+    :type fps: int
+    :param size: Frame (width, height) of the output video.
+    :type size: tuple[int, int]
+    :param queue_size: Maximum number of frames waiting to be encoded, defaults to 32.
+    :type queue_size: int, optional
+    :param overflow: Overflow policy, one of "block", "drop_oldest" or "drop_newest", defaults to "drop_oldest".
+    :type overflow: str, optional
+    :param pre_roll: Seconds of frames kept from before a detection, defaults to 5.
+    :type pre_roll: float, optional
+    :param post_roll: Seconds recorded after the last detection, defaults to 5.
+    :type post_roll: float, optional
+    :param max_clip_length: Seconds after which a clip is closed and a new segment started, defaults to 60.
+    :type max_clip_length: float, optional
+    :param max_clips: Number of clips kept on disk, the oldest are deleted first, defaults to 50.
+    :type max_clips: int, optional
+    """
+
+    def __init__(
+        self,
+        output,
+        fps,
+        size,
+        queue_size=32,
+        overflow="drop_oldest",
+        pre_roll=5.0,
+        post_roll=5.0,
+        max_clip_length=60.0,
+        max_clips=50,
+    ):
+        """
+        Constructor method.
+        """
+        os.makedirs(output, exist_ok=True)
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.max_clip_length = max_clip_length
+        self.max_clips = max_clips
+        self.clips = 0
+        self.events = 0
+        self.clip_path = None
+        self.__held = deque(maxlen=max(1, int(pre_roll * int(fps))))
+        self.__clip_start = None
+        self.__last_detection = None
+        super().__init__(output, fps, size, queue_size, overflow)
+
+    def _record(self, frame, rects, timestamp) -> None:
+        """
+        Holds, or annotates and encodes, a single frame depending on whether a clip is being recorded. Runs on the
+        worker thread.
+
+        :param frame: Frame to record.
+        :type frame: numpy.ndarray
+        :param rects: Detection rectangles to draw on the frame.
+        :type rects: list
+        :param timestamp: Time the frame was captured.
+        :type timestamp: datetime.datetime
+
+        :return: None
+        """
+        if len(rects):
+            if self.writer is None:
+                self.events += 1
+                logging.info(f"Detection event {self.events}, starting clip.")
+            self.__last_detection = timestamp
+
+        if self.writer is None:
+            if not len(rects):
+                self.__held.append((frame, rects, timestamp))
+                return
+            self.__open_clip(timestamp)
+            while self.__held:
+                self.__write(*self.__held.popleft())
+        elif (timestamp - self.__clip_start).total_seconds() > self.max_clip_length:
+            # Rotate long events into a new segment.
+            self._close_writer()
+            self.__open_clip(timestamp)
+
+        self.__write(frame, rects, timestamp)
+
+        if (timestamp - self.__last_detection).total_seconds() > self.post_roll:
+            self._close_writer()
+
+    def _close_writer(self) -> None:
+        """
+        Releases the current clip and deletes the oldest clips beyond the retention limit.
+
+        :return: None
+        """
+        if self.writer is None:
+            return
+        super()._close_writer()
+        logging.info(f"Clip closed: {self.clip_path}")
+        self.clip_path = None
+        self.__clip_start = None
+        clips = sorted(glob.glob(os.path.join(self.output, "clip_*.mp4")))
+        for path in clips[: max(0, len(clips) - self.max_clips)]:
+            try:
+                os.remove(path)
+                logging.info(f"Clip removed by retention limit: {path}")
+            except OSError:
+                logging.exception(f"Failed to remove clip: {path}")
+
+    def __open_clip(self, timestamp) -> None:
+        """
+        Opens a new clip named after the time of its first recorded frame.
+
+        :param timestamp: Time the clip starts.
+        :type timestamp: datetime.datetime
+
+        :return: None
+        """
+        start = self.__held[0][2] if self.__held else timestamp
+        self.clip_path = os.path.join(
+            self.output, f"clip_{start.strftime('%Y%m%d_%H%M%S_%f')}.mp4"
+        )
+        self.writer = self._open_writer(self.clip_path)
+        self.__clip_start = start
+        self.clips += 1
+        logging.info(f"Clip opened: {self.clip_path}")
+
+    def __write(self, frame, rects, timestamp) -> None:
+        """
+        Annotates and encodes a single frame into the open clip.
+
+        :param frame: Frame to record.
+        :type frame: numpy.ndarray
+        :param rects: Detection rectangles to draw on the frame.
+        :type rects: list
+        :param timestamp: Time the frame was captured.
+        :type timestamp: datetime.datetime
+
+        :return: None
+        """
+        annotate(frame, rects, timestamp)
+        self.writer.write(frame)
+        self.encoded += 1
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,119 @@
+"""
+.. module:: tracker
+   :platform: Unix, Windows
+   :synopsis: Lightweight tracking of a detection between cascade runs.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Lightweight tracking of a detection between cascade runs.
+"""
+
+# From the Python Standard Library
+import logging
+
+# From Open Computer Vision
+import cv2
+
+
+class TemplateTracker:
+    """
+    Follows a single detection from frame to frame by matching its appearance within a window around its last
+    position.
+
+    :param search_margin: Fraction of the target's size searched on every side of its last position, defaults to 0.5.
+    :type search_margin: float, optional
+    :param min_confidence: Normalized correlation below which the target is considered lost, defaults to 0.6.
+    :type min_confidence: float, optional
+    """
+
+    def __init__(self, search_margin=0.5, min_confidence=0.6):
+        """
+        Constructor method.
+        """
+        self.search_margin = search_margin
+        self.min_confidence = min_confidence
+        self.confidence = 0.0
+        self.rect = None
+        self.__template = None
+        logging.debug(
+            f"Template tracker created, search margin: {search_margin}, minimum confidence: {min_confidence}"
+        )
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether a target is currently being tracked.
+
+        :return: True if tracking, false otherwise.
+        :rtype: bool
+        """
+        return self.__template is not None
+
+    def start(self, image, rect) -> None:
+        """
+        Starts tracking the given rectangle.
+
+        :param image: Grayscale image the rectangle was found on.
+        :type image: numpy.ndarray
+        :param rect: (x, y, w, h) of the target on the image.
+        :type rect: tuple[int, int, int, int]
+
+        :return: None
+        """
+        x, y, w, h = (int(v) for v in rect)
+        x = min(max(0, x), image.shape[1] - 1)
+        y = min(max(0, y), image.shape[0] - 1)
+        w = min(w, image.shape[1] - x)
+        h = min(h, image.shape[0] - y)
+        self.__template = image[y : y + h, x : x + w].copy()
+        self.rect = (x, y, w, h)
+        self.confidence = 1.0
+
+    def stop(self) -> None:
+        """
+        Stops tracking.
+
+        :return: None
+        """
+        self.__template = None
+        self.rect = None
+        self.confidence = 0.0
+
+    def update(self, image):
+        """
+        Finds the target on a new image. Tracking stops if the match is weaker than min_confidence.
+
+        :param image: Grayscale image at the same scale the tracker was started on.
+        :type image: numpy.ndarray
+
+        :return: (x, y, w, h) of the target on the image, or None if it was lost.
+        :rtype: tuple[int, int, int, int]
+        """
+        if not self.active:
+            return None
+        x, y, w, h = self.rect
+        margin_x = int(w * self.search_margin) + 1
+        margin_y = int(h * self.search_margin) + 1
+        x0 = max(0, x - margin_x)
+        y0 = max(0, y - margin_y)
+        x1 = min(image.shape[1], x + w + margin_x)
+        y1 = min(image.shape[0], y + h + margin_y)
+        if x1 - x0 < w or y1 - y0 < h:
+            self.stop()
+            return None
+
+        scores = cv2.matchTemplate(
+            image[y0:y1, x0:x1], self.__template, cv2.TM_CCOEFF_NORMED
+        )
+        _, confidence, _, location = cv2.minMaxLoc(scores)
+        self.confidence = confidence
+        if confidence < self.min_confidence:
+            logging.debug(f"Tracking lost, confidence {confidence:.2f}.")
+            self.stop()
+            return None
+        self.rect = (x0 + location[0], y0 + location[1], w, h)
+        return self.rect
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
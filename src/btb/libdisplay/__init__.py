@@ -1 +1,26 @@
-from .display import Display
+import importlib
+
+# Exported names and the submodule defining them. Submodules are only
+# imported on first use so that importing the package stays cheap.
+_exports = {
+    "BaseDisplay": ".display",
+    "Display": ".tk",
+    "create_display": ".display",
+    "HeadlessDisplay": ".headless",
+    "ImageDisplay": ".image",
+    "TkDisplay": ".tk",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,26 +5,65 @@
 
 .. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
 
-:synopis: A simple display API used to display short strings.
+:synopis: A simple display API used to display short strings, with interchangeable backends.
 """
 
 # From the Python Standard Library
+import abc
+import importlib
 import logging
-from tkinter import ttk
-import tkinter as tk
-import os
+import threading
+import time
 
+# Display backends by name, as the module and class implementing them. The
+# module is only imported when the backend is selected.
+BACKENDS = {
+    "tk": (".tk", "TkDisplay"),
+    "headless": (".headless", "HeadlessDisplay"),
+    "image": (".image", "ImageDisplay"),
+}
 
-class Display:
+
+def create_display(backend="tk", **kwargs):
+    """
+    Creates a display with the selected backend.
+
+    :param backend: Backend name, one of tk, headless or image, defaults to tk.
+    :type backend: str, optional
+    :param kwargs: Arguments for the backend's constructor.
+    :type kwargs: dict
+
+    :return: Display.
+    :rtype: BaseDisplay
     """
-    Provides display to write strings to.
+    if backend not in BACKENDS:
+        logging.error(f"Invalid display backend selected: {backend}")
+        raise ValueError(f"Invalid display backend selected: {backend}")
+    module, name = BACKENDS[backend]
+    return getattr(importlib.import_module(module, __package__), name)(**kwargs)
+
+
+class BaseDisplay(abc.ABC):
+    """
+    Abstract base class of the display backends. Provides a label to write strings to and, optionally, a top and
+    bottom progress bar.
+
+    The display keeps the visible value of the label and of each progress bar. Progress is quantized to whole pixels
+    of the bar and an update is only passed on to the backend when it changes what is on screen. write() and
+    loading_bar() only record the new value for their widget and return immediately; backends apply pending values
+    together by calling _redraw(), so several updates to the same widget between redraws collapse into the latest
+    one. Backends implement _apply() and _flush().
 
-    :param bg_color: Screen background color, defaults to red
+    :param bg_color: Screen background color, defaults to grey55
     :type bg_color: str, optional
-    :param fg_color: Screen foreground color, defaults to green
+    :param fg_color: Screen foreground color, defaults to blue
     :type fg_color: str, optional
-    :param font: String font, defaults to System 80
+    :param font: String font, defaults to System 150
     :type font: str, optional
+    :param enable_progress: Show the top and bottom progress bars, defaults to False.
+    :type enable_progress: bool, optional
+    :param rate: Maximum redraws per second, defaults to 10.
+    :type rate: float, optional
     """
 
     def __init__(
@@ -33,57 +72,160 @@ class Display:
         fg_color="blue",
         font="System 150",
         enable_progress=False,
+        rate=10,
     ):
         """
         Constructor method.
         """
-        os.environ["DISPLAY"] = ":0"
         self.bg_color = bg_color
         self.fg_color = fg_color
         self.font = font
         self.enable_progress = enable_progress
-        self.root = tk.Tk()
-        self.root.attributes("-fullscreen", True)
-        self.root.configure(bg=self.bg_color)
-        self.display_text = tk.StringVar()
-
-        self.__pb_size = 700
-
-        if self.enable_progress:
-            # Make the top progress bar (tpb).
-            self.tpb = ttk.Progressbar(
-                self.root,
-                orient="horizontal",
-                mode="determinate",
-                length=self.__pb_size,
-            )
-            self.tpb.pack(side=tk.TOP)
-
-        self.label = tk.Label(
-            self.root,
-            textvariable=self.display_text,
-            font=self.font,
-            justify=tk.CENTER,
-            bg=self.bg_color,
-            fg=self.fg_color,
-        )
-        self.label.pack(expand=True)
-
-        if self.enable_progress:
-            # Make the bottom progress bar (bpb).
-            self.bpb = ttk.Progressbar(
-                self.root,
-                orient="horizontal",
-                mode="determinate",
-                length=self.__pb_size,
-            )
-            self.bpb.pack(side=tk.BOTTOM)
+        self.rate = rate
+        # Length of the progress bars in pixels.
+        self.pb_size = 700
+        # Visible value of each widget, progress bars in pixels.
+        self.state = {"label": "Starting", "tpb": 0, "bpb": 0}
+        # Value last drawn on each widget.
+        self.__drawn = dict(self.state)
+        # Latest value waiting to be drawn for each widget.
+        self.__pending = {}
+        self.__lock = threading.Lock()
+        # Number of updates requested, updates that did not change the
+        # visible value, updates replaced by a newer one before being drawn,
+        # widget values pushed to the backend, redraws and the time spent in
+        # them.
+        self.updates = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.redraws = 0
+        self.redraw_time = 0.0
+        self.max_redraw_time = 0.0
+        self.max_queue_depth = 0
+
+    @property
+    def interval(self) -> float:
+        """
+        Seconds between redraws.
+
+        :return: Redraw interval.
+        :rtype: float
+        """
+        return 1 / self.rate
 
+    @property
+    def drawn(self) -> dict:
+        """
+        Value last drawn on each widget, text for the label and pixels for the progress bars.
+
+        :return: Drawn values.
+        :rtype: dict
+        """
+        return dict(self.__drawn)
+
+    @abc.abstractmethod
+    def _apply(self, widget, value) -> None:
+        """
+        Pushes a widget's new value to the backend. Called by _redraw() for each changed widget.
+
+        :param widget: Widget name, one of label, tpb or bpb.
+        :type widget: str
+        :param value: Value to draw, text for the label and pixels for the progress bars.
+        :type value: str or int
+
+        :return: None
+        """
+
+    @abc.abstractmethod
+    def _flush(self) -> None:
+        """
+        Makes the values pushed by _apply() visible. Called by _redraw() once per redraw.
+
+        :return: None
+        """
+
+    def _updated(self) -> None:
+        """
+        Called after a widget value was queued. Backends without a redraw loop of their own override it.
+
+        :return: None
+        """
+
+    def _redraw(self) -> bool:
+        """
+        Applies all pending widget values in a single redraw.
+
+        :return: True if anything was drawn, false otherwise.
+        :rtype: bool
+        """
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = {}
+        # A value may have changed and changed back between redraws.
+        changed = {
+            widget: value
+            for widget, value in pending.items()
+            if value != self.__drawn[widget]
+        }
+        if not changed:
+            return False
+        start = time.perf_counter()
+        for widget, value in changed.items():
+            self.__drawn[widget] = value
+            self._apply(widget, value)
+        self._flush()
+        elapsed = time.perf_counter() - start
+        self.applied += len(changed)
+        self.redraws += 1
+        self.redraw_time += elapsed
+        self.max_redraw_time = max(self.max_redraw_time, elapsed)
+        return True
+
+    def __queue(self, widget, value) -> None:
+        """
+        Records the latest value for a widget, replacing any value not yet drawn.
+
+        :param widget: Widget name, one of label, tpb or bpb.
+        :type widget: str
+        :param value: Value to draw, text for the label and pixels for the progress bars.
+        :type value: str or int
+
+        :return: None
+        """
+        with self.__lock:
+            self.updates += 1
+            if value == self.state[widget]:
+                self.skipped += 1
+                return
+            self.state[widget] = value
+            if widget in self.__pending:
+                self.coalesced += 1
+            self.__pending[widget] = value
+            self.max_queue_depth = max(self.max_queue_depth, len(self.__pending))
+        self._updated()
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of widgets with a value waiting to be drawn.
+
+        :return: Queue depth.
+        :rtype: int
+        """
+        with self.__lock:
+            return len(self.__pending)
+
+    def close(self) -> None:
+        """
+        Closes the display.
+
+        :return: None
+        """
         logging.info(
-            f"Creating display object, background: {bg_color}, forground: {fg_color}, font: {font}"
+            f"Display closed, {self.redraws} redraws, {self.updates} updates, {self.skipped} skipped, "
+            f"{self.coalesced} coalesced, {self.applied} applied."
         )
-        self.current_text = "Starting"
-        self.current_progress = 0
 
     def write(self, text) -> None:
         """
@@ -97,18 +239,13 @@ class Display:
         if str != type(text):
             logging.error(f"Invalid text to display: {text} - Must be of type str.")
             raise TypeError(f"Invalid text to display: {text} - Must be of type str.")
-        # Exit function early if no value is added.
-        if text == self.current_text:
-            return None
-        self.current_text = text
-        self.display_text.set(text.upper())
-        self.label.pack(expand=True)
-        self.root.update()
-        logging.info(f"Writing text: {text}")
+        if text != self.state["label"]:
+            logging.info(f"Writing text: {text}")
+        self.__queue("label", text)
 
     def loading_bar(self, progress, bar) -> None:
         """
-        Writes string to the screen.
+        Sets a progress bar.
 
         :param progress: Percentage, in the form of a number spanning zero to one hundred, to set the progress bar to.
         :type progress: int
@@ -118,10 +255,6 @@ class Display:
 
         :return: None
         """
-        # Exit function early if no value is added.
-        if progress == self.current_progress:
-            return None
-        self.current_progress = progress
         if not self.enable_progress:
             logging.warning(
                 f"This Display object does not support progress bars. Please enable the use of progress bars during construction."
@@ -130,11 +263,19 @@ class Display:
         if None == progress:
             logging.error(f"Invalid progress percentage: {progress}")
             raise TypeError(f"Invalid progress percentage: {progress}")
-        if bar:
-            self.tpb["value"] = progress
-        else:
-            self.bpb["value"] = progress
-        self.root.update()
+        # Only whole pixels of the bar are visible.
+        pixels = round(min(100, max(0, progress)) * self.pb_size / 100)
+        self.__queue("tpb" if bar else "bpb", pixels)
+
+
+def __getattr__(name):
+    # Display was the Tk window before the backends were split out, keep it
+    # importable from here without importing the Tk backend up front.
+    if "Display" == name:
+        from .tk import Display
+
+        return Display
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
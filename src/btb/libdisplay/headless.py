@@ -0,0 +1,78 @@
+"""
+.. module:: headless
+   :platform: Unix, Windows
+   :synopsis: In-memory display backend.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: In-memory display backend for machines without a screen, tests and benchmarks.
+"""
+
+# From the Python Standard Library
+import logging
+
+# From libdisplay
+from .display import BaseDisplay
+
+
+class HeadlessDisplay(BaseDisplay):
+    """
+    Display that only keeps what would be on screen in memory, see drawn. Every update that changes a widget is
+    applied immediately on the calling thread, so no thread is started and the result is deterministic.
+
+    :param bg_color: Screen background color, defaults to grey55
+    :type bg_color: str, optional
+    :param fg_color: Screen foreground color, defaults to blue
+    :type fg_color: str, optional
+    :param font: String font, defaults to System 150
+    :type font: str, optional
+    :param enable_progress: Keep the top and bottom progress bars, defaults to False.
+    :type enable_progress: bool, optional
+    :param rate: Unused, updates are applied immediately, defaults to 10.
+    :type rate: float, optional
+    """
+
+    def __init__(
+        self,
+        bg_color="grey55",
+        fg_color="blue",
+        font="System 150",
+        enable_progress=False,
+        rate=10,
+    ):
+        """
+        Constructor method.
+        """
+        super().__init__(bg_color, fg_color, font, enable_progress, rate)
+        logging.info("Creating headless display object.")
+
+    def _apply(self, widget, value) -> None:
+        """
+        Nothing to push, the value is already in drawn.
+
+        :param widget: Widget name, one of label, tpb or bpb.
+        :type widget: str
+        :param value: Value to draw, text for the label and pixels for the progress bars.
+        :type value: str or int
+
+        :return: None
+        """
+
+    def _flush(self) -> None:
+        """
+        Nothing to make visible.
+
+        :return: None
+        """
+
+    def _updated(self) -> None:
+        """
+        Applies the update immediately.
+
+        :return: None
+        """
+        self._redraw()
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
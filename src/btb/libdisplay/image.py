@@ -0,0 +1,182 @@
+"""
+.. module:: image
+   :platform: Unix, Windows
+   :synopsis: Image and framebuffer display backend.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Display backend rendering the screen into an image file or straight into a Linux framebuffer device.
+"""
+
+# From the Python Standard Library
+import logging
+import os
+import threading
+
+# From Open Computer Vision
+import cv2
+
+# From NumPy
+import numpy as np
+
+# From libdisplay
+from .display import BaseDisplay
+
+
+class ImageDisplay(BaseDisplay):
+    """
+    Renders the label and progress bars with OpenCV, without a window system, at most rate times per second on a
+    dedicated thread. The result is written to an image file, replaced atomically so readers never see a partial
+    image, or to a framebuffer device such as /dev/fb0.
+
+    :param output: Image file, e.g. screen.png, or framebuffer device, defaults to screen.png.
+    :type output: str, optional
+    :param size: (width, height) of the screen in pixels, defaults to (800, 480).
+    :type size: tuple[int, int], optional
+    :param pixel_format: Framebuffer pixel format, one of bgra or rgb565, defaults to bgra.
+    :type pixel_format: str, optional
+    :param bg_color: Screen background color as BGR, defaults to grey.
+    :type bg_color: tuple[int, int, int], optional
+    :param fg_color: Screen foreground color as BGR, defaults to blue.
+    :type fg_color: tuple[int, int, int], optional
+    :param font_scale: OpenCV font scale of the label, defaults to 4.0.
+    :type font_scale: float, optional
+    :param enable_progress: Show the top and bottom progress bars, defaults to False.
+    :type enable_progress: bool, optional
+    :param rate: Maximum redraws per second, defaults to 10.
+    :type rate: float, optional
+    """
+
+    PIXEL_FORMATS = {"bgra": cv2.COLOR_BGR2BGRA, "rgb565": cv2.COLOR_BGR2BGR565}
+
+    def __init__(
+        self,
+        output="screen.png",
+        size=(800, 480),
+        pixel_format="bgra",
+        bg_color=(140, 140, 140),
+        fg_color=(255, 0, 0),
+        font_scale=4.0,
+        enable_progress=False,
+        rate=10,
+    ):
+        """
+        Constructor method.
+        """
+        if pixel_format not in self.PIXEL_FORMATS:
+            logging.error(f"Invalid pixel format selected: {pixel_format}")
+            raise ValueError(f"Invalid pixel format selected: {pixel_format}")
+        super().__init__(bg_color, fg_color, None, enable_progress, rate)
+        self.output = output
+        self.size = tuple(size)
+        self.pixel_format = pixel_format
+        self.font_scale = font_scale
+        self.pb_size = min(self.pb_size, self.size[0] - 20)
+        self.image = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        if output.startswith("/dev/fb"):
+            self.__device = open(output, "r+b")
+        else:
+            self.__device = None
+        self.__closing = threading.Event()
+        # Draw the initial screen before any update arrives.
+        self._flush()
+        self.__thread = threading.Thread(target=self.__run, name="display", daemon=True)
+        self.__thread.start()
+        logging.info(f"Creating image display object, output: {output}, size: {size}")
+
+    def __run(self) -> None:
+        """
+        Display thread. Redraws every interval until closed.
+
+        :return: None
+        """
+        while not self.__closing.wait(self.interval):
+            self._redraw()
+
+    def __bar(self, y, pixels) -> None:
+        """
+        Draws a progress bar.
+
+        :param y: Top of the bar.
+        :type y: int
+        :param pixels: Filled length of the bar.
+        :type pixels: int
+
+        :return: None
+        """
+        x = (self.size[0] - self.pb_size) // 2
+        cv2.rectangle(
+            self.image, (x, y), (x + self.pb_size, y + 20), (200, 200, 200), -1
+        )
+        if pixels:
+            cv2.rectangle(self.image, (x, y), (x + pixels, y + 20), self.fg_color, -1)
+        cv2.rectangle(self.image, (x, y), (x + self.pb_size, y + 20), self.fg_color, 1)
+
+    def _apply(self, widget, value) -> None:
+        """
+        Nothing to push, _flush() renders the whole screen from drawn.
+
+        :param widget: Widget name, one of label, tpb or bpb.
+        :type widget: str
+        :param value: Value to draw, text for the label and pixels for the progress bars.
+        :type value: str or int
+
+        :return: None
+        """
+
+    def _flush(self) -> None:
+        """
+        Renders the screen from the drawn values and writes it out.
+
+        :return: None
+        """
+        drawn = self.drawn
+        self.image[:] = self.bg_color
+        if self.enable_progress:
+            self.__bar(10, drawn["tpb"])
+            self.__bar(self.size[1] - 30, drawn["bpb"])
+        text = drawn["label"].upper()
+        (width, height), _ = cv2.getTextSize(
+            text, cv2.FONT_HERSHEY_SIMPLEX, self.font_scale, 4
+        )
+        cv2.putText(
+            self.image,
+            text,
+            ((self.size[0] - width) // 2, (self.size[1] + height) // 2),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            self.font_scale,
+            self.fg_color,
+            4,
+            cv2.LINE_AA,
+        )
+
+        if self.__device is not None:
+            self.__device.seek(0)
+            self.__device.write(
+                cv2.cvtColor(
+                    self.image, self.PIXEL_FORMATS[self.pixel_format]
+                ).tobytes()
+            )
+            self.__device.flush()
+        else:
+            root, extension = os.path.splitext(self.output)
+            temporary = f"{root}.tmp{extension}"
+            cv2.imwrite(temporary, self.image)
+            os.replace(temporary, self.output)
+
+    def close(self) -> None:
+        """
+        Stops the display thread, draws any pending values and closes the framebuffer device.
+
+        :return: None
+        """
+        self.__closing.set()
+        self.__thread.join()
+        self._redraw()
+        if self.__device is not None:
+            self.__device.close()
+        super().close()
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,186 @@
+"""
+.. module:: tk
+   :platform: Unix, Windows
+   :synopsis: Tk display backend.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Full screen Tk display backend.
+"""
+
+# From the Python Standard Library
+import logging
+import os
+import threading
+
+# From libdisplay
+from .display import BaseDisplay
+
+
+class TkDisplay(BaseDisplay):
+    """
+    Full screen Tk window. Tk runs its mainloop on a dedicated thread and pending values are applied at most rate
+    times per second. tkinter is only imported, and DISPLAY only set, when a TkDisplay is created.
+
+    :param bg_color: Screen background color, defaults to grey55
+    :type bg_color: str, optional
+    :param fg_color: Screen foreground color, defaults to blue
+    :type fg_color: str, optional
+    :param font: String font, defaults to System 150
+    :type font: str, optional
+    :param enable_progress: Show the top and bottom progress bars, defaults to False.
+    :type enable_progress: bool, optional
+    :param rate: Maximum redraws per second, defaults to 10.
+    :type rate: float, optional
+    """
+
+    def __init__(
+        self,
+        bg_color="grey55",
+        fg_color="blue",
+        font="System 150",
+        enable_progress=False,
+        rate=10,
+    ):
+        """
+        Constructor method.
+        """
+        super().__init__(bg_color, fg_color, font, enable_progress, rate)
+        os.environ.setdefault("DISPLAY", ":0")
+        self.__ready = threading.Event()
+        self.__closing = threading.Event()
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__run, name="display", daemon=True)
+        self.__thread.start()
+        self.__ready.wait()
+        if self.__error is not None:
+            raise self.__error
+        logging.info(
+            f"Creating display object, background: {bg_color}, forground: {fg_color}, font: {font}"
+        )
+
+    def __run(self) -> None:
+        """
+        Display thread. Builds the widgets and runs the Tk mainloop, Tk objects must only be used from this thread.
+
+        :return: None
+        """
+        try:
+            self.__build()
+        except Exception as error:
+            logging.error(f"Failure to create display: {error}")
+            self.__error = error
+            self.__ready.set()
+            return
+        self.__ready.set()
+        self.root.after(self.__milliseconds, self.__tick)
+        self.root.mainloop()
+        self.root.destroy()
+
+    def __build(self) -> None:
+        """
+        Creates the Tk window and widgets.
+
+        :return: None
+        """
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.root = tk.Tk()
+        self.root.attributes("-fullscreen", True)
+        self.root.configure(bg=self.bg_color)
+        self.display_text = tk.StringVar()
+
+        if self.enable_progress:
+            # Make the top progress bar (tpb).
+            self.tpb = ttk.Progressbar(
+                self.root,
+                orient="horizontal",
+                mode="determinate",
+                length=self.pb_size,
+            )
+            self.tpb.pack(side=tk.TOP)
+
+        self.label = tk.Label(
+            self.root,
+            textvariable=self.display_text,
+            font=self.font,
+            justify=tk.CENTER,
+            bg=self.bg_color,
+            fg=self.fg_color,
+        )
+        self.label.pack(expand=True)
+
+        if self.enable_progress:
+            # Make the bottom progress bar (bpb).
+            self.bpb = ttk.Progressbar(
+                self.root,
+                orient="horizontal",
+                mode="determinate",
+                length=self.pb_size,
+            )
+            self.bpb.pack(side=tk.BOTTOM)
+
+    @property
+    def __milliseconds(self) -> int:
+        """
+        Milliseconds between redraws.
+
+        :return: Redraw interval.
+        :rtype: int
+        """
+        return max(1, int(1000 * self.interval))
+
+    def __tick(self) -> None:
+        """
+        Redraws and schedules the next redraw. Runs on the display thread.
+
+        :return: None
+        """
+        if self.__closing.is_set():
+            self.root.quit()
+            return
+        self._redraw()
+        self.root.after(self.__milliseconds, self.__tick)
+
+    def _apply(self, widget, value) -> None:
+        """
+        Sets a Tk widget's value.
+
+        :param widget: Widget name, one of label, tpb or bpb.
+        :type widget: str
+        :param value: Value to draw, text for the label and pixels for the progress bars.
+        :type value: str or int
+
+        :return: None
+        """
+        if "label" == widget:
+            self.display_text.set(value.upper())
+        else:
+            getattr(self, widget)["value"] = value * 100 / self.pb_size
+
+    def _flush(self) -> None:
+        """
+        Processes the pending Tk redraws.
+
+        :return: None
+        """
+        self.root.update_idletasks()
+
+    def close(self) -> None:
+        """
+        Stops the Tk mainloop at the next redraw and waits for the display thread to exit.
+
+        :return: None
+        """
+        self.__closing.set()
+        self.__thread.join()
+        super().close()
+
+
+# The Tk window is the default display.
+Display = TkDisplay
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+.. module:: benchmark
+   :platform: Unix, Windows
+   :synopsis: Startup benchmark of the stock universe.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Measures the time from starting a fresh Python process to reading the first stock symbol, for the original
+    pandas loader, parsing the constituents file and mapping its snapshot, along with the time of the load alone.
+
+Example::
+
+    python -m btb.libstocks.benchmark --repeat 10
+"""
+
+# From the Python Standard Library
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# From NumPy
+import numpy as np
+
+# From libstocks
+from .universe import DATA_FILE
+
+# Setup and load of programs reading the first symbol of the constituents
+# file passed as their first argument, after baselines for the interpreter
+# and numpy alone. numpy is imported during setup so that the load time,
+# measured within the process, leaves out its import, which dominates and
+# varies run to run.
+LOADERS = {
+    "interpreter": ("", "pass"),
+    "numpy": ("", "import numpy"),
+    "pandas": (
+        "import numpy",
+        "import pandas; pandas.read_csv(sys.argv[1]).Symbol[0]",
+    ),
+    "csv": (
+        "import numpy",
+        "from btb.libstocks.universe import Universe; "
+        "Universe.from_csv(sys.argv[1]).symbol[0]",
+    ),
+    "snapshot": (
+        "import numpy",
+        "from btb.libstocks.snapshot import load; load(sys.argv[1]).symbol[0]",
+    ),
+}
+
+# Runs a loader and prints the seconds its load took.
+PROGRAM = """\
+import sys, time
+{}
+begin = time.perf_counter()
+{}
+print(time.perf_counter() - begin)
+"""
+
+
+def benchmark(loader, path, repeat=10):
+    """
+    Times fresh processes running a loader.
+
+    :param loader: Loader name in LOADERS.
+    :type loader: str
+    :param path: Constituents csv file.
+    :type path: str
+    :param repeat: Number of processes, defaults to 10.
+    :type repeat: int, optional
+
+    :return: Times from process start to exit and of the load alone in seconds, one row per process.
+    :rtype: numpy.ndarray
+    """
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    times = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-c", PROGRAM.format(*LOADERS[loader]), path],
+            env=env,
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        times.append((time.perf_counter() - begin, float(process.stdout)))
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m btb.libstocks.benchmark",
+        description="Measures the time from process start to the first stock symbol for each stock universe loader.",
+    )
+    parser.add_argument(
+        "--file", default=DATA_FILE, help="Constituents csv file to load."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Processes started per loader."
+    )
+    args = parser.parse_args()
+
+    # Work on a copy so that the snapshot measured is built here and any
+    # existing snapshot next to the file is left alone.
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, os.path.basename(args.file))
+        shutil.copy(args.file, path)
+        # Build the snapshot before timing the loads that map it.
+        benchmark("snapshot", path, 1)
+        # Loaders take turns, one process each per round, so that drift in
+        # the machine's speed over the run does not favour any of them.
+        times = {loader: [] for loader in LOADERS}
+        for _ in range(args.repeat):
+            for loader in LOADERS:
+                if times[loader] is None:
+                    continue
+                try:
+                    times[loader].extend(benchmark(loader, path, 1))
+                except subprocess.CalledProcessError:
+                    times[loader] = None
+        print(
+            f"{'loader':<12} {'median ms':>9} {'min ms':>7} {'max ms':>7} {'load ms':>7}"
+        )
+        for loader in LOADERS:
+            if times[loader] is None:
+                print(f"{loader:<12} {'failed':>9}")
+                continue
+            total, load = np.array(times[loader]).T * 1000
+            print(
+                f"{loader:<12} {np.median(total):>9.1f} {total.min():>7.1f} "
+                f"{total.max():>7.1f} {np.median(load):>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+.. module:: query
+   :platform: Unix, Windows
+   :synopsis: Filtering and ranking of the stock universe.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Filtering by sector, market capitalization and dividend yield and ranking by numeric columns over the
+    precomputed indexes of the stock universe.
+"""
+
+# From the Python Standard Library
+import logging
+
+# From NumPy
+import numpy as np
+
+# From libstocks
+from .stocks import Stocks
+from .universe import universe
+
+
+class Query:
+    """
+    Selects stocks from the universe. Every filter returns a new query, so queries can be built up and reused:
+
+    Example::
+
+        large_cap_tech = Query().sector("Information Technology").market_cap(low=200e9)
+        large_cap_tech.sort("dividend_yield", descending=True).symbols()
+
+    Filters are combined as a boolean row mask. Sector filters use the universe's per-sector masks and range filters
+    binary search the column's precomputed sort order, so no filter looks at rows one by one.
+
+    :param stocks: Stock universe to query, defaults to the shared Russell 1000 universe.
+    :type stocks: Universe, optional
+    """
+
+    def __init__(self, stocks=None):
+        """
+        Constructor method.
+        """
+        self.universe = stocks if stocks is not None else universe()
+        self.mask = np.ones(len(self.universe), dtype=bool)
+        self.order = None
+        self.descending = False
+
+    def __derive(self, mask=None, order=None, descending=False):
+        """
+        Returns a copy of the query with a further row mask applied and optionally a new sort order.
+
+        :param mask: Rows to keep, defaults to all.
+        :type mask: numpy.ndarray, optional
+        :param order: Column to sort by, defaults to the current sort order.
+        :type order: str, optional
+        :param descending: Sort from largest to smallest, defaults to False.
+        :type descending: bool, optional
+
+        :return: Query.
+        :rtype: Query
+        """
+        query = Query.__new__(Query)
+        query.universe = self.universe
+        query.mask = self.mask if mask is None else self.mask & mask
+        query.order = self.order if order is None else order
+        query.descending = self.descending if order is None else descending
+        return query
+
+    def __column(self, column) -> None:
+        """
+        Checks that a column is numeric.
+
+        :param column: Column name.
+        :type column: str
+
+        :return: None
+        """
+        if column not in self.universe.NUMERIC:
+            logging.error(f"Invalid numeric column: {column}")
+            raise ValueError(f"Invalid numeric column: {column}")
+
+    def sector(self, *names):
+        """
+        Keeps stocks in any of the given sectors, e.g. "Information Technology". Names are not case sensitive.
+
+        :param names: Sector names.
+        :type names: str
+
+        :return: Query.
+        :rtype: Query
+        """
+        sectors = [sector.lower() for sector in self.universe.sectors]
+        mask = np.zeros(len(self.universe), dtype=bool)
+        for name in names:
+            if name.lower() not in sectors:
+                logging.error(f"Invalid sector: {name}")
+                raise ValueError(f"Invalid sector: {name}")
+            mask |= self.universe.sector_masks[sectors.index(name.lower())]
+        return self.__derive(mask)
+
+    def range(self, column, low=None, high=None):
+        """
+        Keeps stocks whose value of a numeric column is within a range.
+
+        :param column: Column name, one of market_cap or dividend_yield.
+        :type column: str
+        :param low: Smallest value kept, defaults to no lower bound.
+        :type low: float, optional
+        :param high: Largest value kept, defaults to no upper bound.
+        :type high: float, optional
+
+        :return: Query.
+        :rtype: Query
+        """
+        self.__column(column)
+        ordered = self.universe.ordered[column]
+        start = 0 if low is None else np.searchsorted(ordered, low, "left")
+        stop = len(ordered) if high is None else np.searchsorted(ordered, high, "right")
+        mask = np.zeros(len(self.universe), dtype=bool)
+        mask[self.universe.orders[column][start:stop]] = True
+        return self.__derive(mask)
+
+    def market_cap(self, low=None, high=None):
+        """
+        Keeps stocks whose market capitalization in dollars is within a range.
+
+        :param low: Smallest market capitalization kept, defaults to no lower bound.
+        :type low: float, optional
+        :param high: Largest market capitalization kept, defaults to no upper bound.
+        :type high: float, optional
+
+        :return: Query.
+        :rtype: Query
+        """
+        return self.range("market_cap", low, high)
+
+    def dividend_yield(self, low=None, high=None):
+        """
+        Keeps stocks whose dividend yield in percent is within a range.
+
+        :param low: Smallest dividend yield kept, defaults to no lower bound.
+        :type low: float, optional
+        :param high: Largest dividend yield kept, defaults to no upper bound.
+        :type high: float, optional
+
+        :return: Query.
+        :rtype: Query
+        """
+        return self.range("dividend_yield", low, high)
+
+    def sort(self, column, descending=False):
+        """
+        Orders the stocks by a numeric column. Ties are in the order of the constituents file when ascending and in
+        reverse order when descending.
+
+        :param column: Column name, one of market_cap or dividend_yield.
+        :type column: str
+        :param descending: Sort from largest to smallest, defaults to False.
+        :type descending: bool, optional
+
+        :return: Query.
+        :rtype: Query
+        """
+        self.__column(column)
+        return self.__derive(order=column, descending=descending)
+
+    def rows(self):
+        """
+        Returns the row numbers of the selected stocks, in the query's order or the order of the constituents file.
+
+        :return: Row numbers.
+        :rtype: numpy.ndarray
+        """
+        if self.order is None:
+            return np.flatnonzero(self.mask)
+        order = self.universe.orders[self.order]
+        if self.descending:
+            order = order[::-1]
+        return order[self.mask[order]]
+
+    def symbols(self) -> list:
+        """
+        Returns the symbols of the selected stocks.
+
+        :return: Symbols.
+        :rtype: list[str]
+        """
+        return self.universe.symbol[self.rows()].tolist()
+
+    def stocks(self) -> list:
+        """
+        Returns views of the selected stocks.
+
+        :return: Stocks.
+        :rtype: list[Stocks]
+        """
+        return [Stocks(int(row), self.universe) for row in self.rows()]
+
+    def __len__(self) -> int:
+        """
+        Returns the number of selected stocks.
+
+        :return: Number of stocks.
+        :rtype: int
+        """
+        return int(np.count_nonzero(self.mask))
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,100 @@
+"""
+.. module:: refresh
+   :platform: Unix, Windows
+   :synopsis: Incremental refresh of the stock universe.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Applies a new constituents file to the loaded stock universe without a restart, by diffing it against the
+    loaded rows and swapping in a patched universe.
+"""
+
+# From the Python Standard Library
+import csv
+import logging
+import os
+import threading
+
+# From libstocks
+from .universe import parse_record, replace, universe
+
+# Serializes refreshes. Readers of the universe never take it.
+_lock = threading.Lock()
+
+
+def diff(stocks, rows) -> dict:
+    """
+    Compares constituent records against a universe by symbol. The records are consumed one at a time, so a file can
+    be streamed through without being parsed in full first.
+
+    :param stocks: Universe to compare against.
+    :type stocks: Universe
+    :param rows: Records of the constituents file, e.g. from csv.DictReader.
+    :type rows: iterable[dict]
+
+    :return: Changed values by row number under changed, row numbers under removed, values of new stocks under
+        added and the symbols in the order of the records under order, ready for Universe.patch.
+    :rtype: dict
+    """
+    changed = {}
+    added = []
+    order = []
+    seen = set()
+    for row in rows:
+        values = parse_record(row)
+        symbol = values[0]
+        if symbol in seen:
+            logging.warning(f"Duplicate symbol in constituents: {symbol}")
+            continue
+        seen.add(symbol)
+        order.append(symbol)
+        index = stocks.by_symbol.get(symbol)
+        if index is None:
+            added.append(values)
+        elif values != stocks.record(index):
+            changed[index] = values
+    removed = [
+        index for symbol, index in stocks.by_symbol.items() if symbol not in seen
+    ]
+    return {"changed": changed, "removed": removed, "added": added, "order": order}
+
+
+def refresh(path, rotation=None) -> dict:
+    """
+    Refreshes the shared stock universe from a new constituents file. The universe is patched with only the added,
+    removed and changed stocks and swapped in atomically: Stocks views, queries and rotations created before keep
+    reading the universe they were created with, new ones get the refreshed universe.
+
+    :param path: Constituents csv file.
+    :type path: str
+    :param rotation: Rotation to move onto the refreshed universe, defaults to None.
+    :type rotation: Rotation, optional
+
+    :return: Symbols added, removed and changed.
+    :rtype: dict[str, list[str]]
+    """
+    if not os.path.exists(path):
+        logging.error(f"Invalid file path: {path}")
+        raise Exception(f"Invalid file path: {path}")
+    with _lock:
+        old = universe()
+        with open(path, newline="") as file:
+            changes = diff(old, csv.DictReader(file))
+        summary = {
+            "added": [values[0] for values in changes["added"]],
+            "removed": [str(old.symbol[index]) for index in changes["removed"]],
+            "changed": [str(old.symbol[index]) for index in changes["changed"]],
+        }
+        if any(summary.values()):
+            replace(old.patch(**changes))
+    logging.info(
+        f"Stock universe refreshed from {path}, added: {len(summary['added'])}, "
+        f"removed: {len(summary['removed'])}, changed: {len(summary['changed'])}"
+    )
+    if rotation is not None:
+        rotation.rebase(universe())
+    return summary
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,295 @@
+"""
+.. module:: rotation
+   :platform: Unix, Windows
+   :synopsis: Schedules the stocks available for trade.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Schedules the order in which stocks are available for trade and warms the next stock's market data in the
+    background shortly before each switch.
+"""
+
+# From the Python Standard Library
+from collections import deque
+import logging
+import threading
+
+# From NumPy
+import numpy as np
+
+# From libstocks
+from .stocks import Stocks
+from .universe import universe
+
+
+class Rotation:
+    """
+    Rotates through a set of stocks, keeping the next few decided in advance.
+
+    The strategies are:
+
+    - sequential: the stocks in order, starting over after the last one.
+    - shuffle: every stock once in random order, then again in a new order.
+    - weighted: random stocks drawn with probability proportional to market capitalization.
+
+    No strategy offers the same stock twice in a row when there is more than one. Once progress() reports that the
+    current slot is nearly over, prefetch is called with the next symbol on a background thread, so that its market
+    data is warm by the time it becomes current.
+
+    :param rows: Row numbers of the stocks to rotate through, e.g. from Query.rows(), defaults to every stock.
+    :type rows: list[int], optional
+    :param strategy: One of sequential, shuffle or weighted, defaults to sequential.
+    :type strategy: str, optional
+    :param lookahead: Number of upcoming stocks decided in advance, defaults to 3.
+    :type lookahead: int, optional
+    :param prefetch: Called with the next symbol shortly before each switch, defaults to None.
+    :type prefetch: callable, optional
+    :param prefetch_at: Progress through the current slot, in percent, at which to prefetch, defaults to 90.
+    :type prefetch_at: int, optional
+    :param seed: Random seed, defaults to None.
+    :type seed: int, optional
+    :param stocks: Stock universe the rows refer to, defaults to the shared Russell 1000 universe.
+    :type stocks: Universe, optional
+
+    After a refresh of the universe, rebase() moves the rotation onto the new universe, continuing from the same
+    stock if it is still listed.
+    """
+
+    STRATEGIES = ("sequential", "shuffle", "weighted")
+
+    def __init__(
+        self,
+        rows=None,
+        strategy="sequential",
+        lookahead=3,
+        prefetch=None,
+        prefetch_at=90,
+        seed=None,
+        stocks=None,
+    ):
+        """
+        Constructor method.
+        """
+        if strategy not in self.STRATEGIES:
+            logging.error(f"Invalid rotation strategy selected: {strategy}")
+            raise ValueError(f"Invalid rotation strategy selected: {strategy}")
+        self.universe = stocks if stocks is not None else universe()
+        # Rotations over every stock take in stocks added by a refresh.
+        self.__everything = rows is None
+        if rows is None:
+            rows = np.arange(len(self.universe))
+        self.rows = np.asarray(rows, dtype=int)
+        if not len(self.rows):
+            logging.error("Rotation has no stocks to rotate through.")
+            raise ValueError("Rotation has no stocks to rotate through.")
+        self.strategy = strategy
+        self.lookahead = max(1, lookahead)
+        self.prefetch = prefetch
+        self.prefetch_at = prefetch_at
+        self.prefetched = 0
+        self.__random = np.random.default_rng(seed)
+        self.__position = 0
+        self.__order = np.empty(0, dtype=int)
+        self.__upcoming = deque()
+        self.__warmed = False
+        self.__lock = threading.Lock()
+        self.__pending = None
+        self.__wake = threading.Condition(self.__lock)
+        self.__thread = None
+        self.__rebased = None
+        self.current = Stocks(self.__draw(None), self.universe)
+        self.__fill()
+        logging.info(
+            f"Rotation created, strategy: {strategy}, stocks: {len(self.rows)}, first: {self.current.symbol}"
+        )
+
+    def __draw(self, previous) -> int:
+        """
+        Decides the stock after another one.
+
+        :param previous: Row of the previous stock, or None for the first.
+        :type previous: int
+
+        :return: Row of the stock.
+        :rtype: int
+        """
+        if "sequential" == self.strategy:
+            row = self.rows[self.__position % len(self.rows)]
+            self.__position = (self.__position + 1) % len(self.rows)
+            return int(row)
+        if "shuffle" == self.strategy:
+            if self.__position >= len(self.__order):
+                self.__order = self.__random.permutation(self.rows)
+                # Do not repeat the last stock of the previous pass.
+                if len(self.__order) > 1 and self.__order[0] == previous:
+                    self.__order[[0, -1]] = self.__order[[-1, 0]]
+                self.__position = 0
+            row = self.__order[self.__position]
+            self.__position += 1
+            return int(row)
+        weights = self.universe.market_cap[self.rows].astype(float)
+        if len(self.rows) > 1 and previous is not None:
+            weights[self.rows == previous] = 0.0
+        return int(self.__random.choice(self.rows, p=weights / weights.sum()))
+
+    def __fill(self) -> None:
+        """
+        Decides upcoming stocks until lookahead are known.
+
+        :return: None
+        """
+        while len(self.__upcoming) < self.lookahead:
+            if self.__upcoming:
+                previous = self.__upcoming[-1]
+            else:
+                previous = self.universe.by_symbol.get(self.current.symbol)
+            self.__upcoming.append(self.__draw(previous))
+
+    def rebase(self, stocks) -> None:
+        """
+        Moves the rotation onto another universe, e.g. after refresh(). Stocks are matched by symbol: the current and
+        upcoming stocks carry over if they are still listed, removed stocks are dropped and, for a rotation over every
+        stock, added stocks join. A sequential rotation continues after the current stock.
+
+        May be called from any thread, the rotation switches over on its next call to upcoming(), next() or progress().
+
+        :param stocks: Universe.
+        :type stocks: Universe
+
+        :return: None
+        """
+        self.__rebased = stocks
+
+    def __rebase(self) -> None:
+        """
+        Switches over to the universe passed to rebase(), if any.
+
+        :return: None
+        """
+        stocks, self.__rebased = self.__rebased, None
+        if stocks is None or stocks is self.universe:
+            return
+        symbols = self.universe.symbol
+
+        def remap(rows):
+            mapped = (stocks.by_symbol.get(str(symbols[row])) for row in rows)
+            return [row for row in mapped if row is not None]
+
+        rows = np.arange(len(stocks)) if self.__everything else remap(self.rows)
+        if not len(rows):
+            logging.warning(
+                "Rotation kept on the old universe, none of its stocks remain."
+            )
+            return
+        first = self.upcoming()[:1]
+        current = stocks.by_symbol.get(self.current.symbol)
+        upcoming = remap(self.__upcoming)
+        order = remap(self.__order[self.__position :])
+        self.universe = stocks
+        self.rows = np.asarray(rows, dtype=int)
+        # A removed current stock stays readable through its old view until
+        # the next rotation.
+        if current is not None:
+            self.current = Stocks(current, stocks)
+        if "sequential" == self.strategy:
+            # Continue after the current stock or, if it was removed, from the
+            # next one still listed.
+            if current is not None and current in self.rows:
+                anchors, offset = [current], 1
+            else:
+                anchors, offset = [row for row in upcoming if row in self.rows], 0
+            if anchors:
+                self.__position = (
+                    int(np.flatnonzero(self.rows == anchors[0])[0]) + offset
+                )
+            self.__position %= len(self.rows)
+            upcoming = []
+        elif "shuffle" == self.strategy:
+            self.__order = np.asarray(order, dtype=int)
+            self.__position = 0
+        # Removals can leave the same stock twice in a row.
+        previous = current
+        self.__upcoming = deque()
+        for row in upcoming:
+            if row != previous or len(self.rows) == 1:
+                self.__upcoming.append(row)
+            previous = row
+        self.__fill()
+        if self.upcoming()[:1] != first:
+            self.__warmed = False
+        logging.info(
+            f"Rotation rebased, stocks: {len(self.rows)}, current: {self.current.symbol}"
+        )
+
+    def upcoming(self) -> list:
+        """
+        Returns the symbols of the stocks that will follow the current one, next first.
+
+        :return: Symbols.
+        :rtype: list[str]
+        """
+        self.__rebase()
+        return [str(self.universe.symbol[row]) for row in self.__upcoming]
+
+    def next(self):
+        """
+        Moves on to the next stock.
+
+        :return: The new current stock.
+        :rtype: Stocks
+        """
+        self.__rebase()
+        self.current = Stocks(self.__upcoming.popleft(), self.universe)
+        self.__fill()
+        self.__warmed = False
+        logging.info(f"Rotated to {self.current.symbol}.")
+        return self.current
+
+    def progress(self, percent) -> None:
+        """
+        Reports how far through its slot the current stock is and prefetches the next stock's data once prefetch_at
+        is reached. Returns immediately, the prefetch runs on a background thread.
+
+        :param percent: Percentage of the current slot elapsed.
+        :type percent: int
+
+        :return: None
+        """
+        self.__rebase()
+        if self.prefetch is None or self.__warmed or percent is None:
+            return
+        if percent < self.prefetch_at:
+            return
+        self.__warmed = True
+        symbol = str(self.universe.symbol[self.__upcoming[0]])
+        with self.__lock:
+            self.__pending = symbol
+            if self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="prefetch", daemon=True
+                )
+                self.__thread.start()
+            self.__wake.notify()
+
+    def __run(self) -> None:
+        """
+        Prefetch thread. Prefetches the latest requested symbol, a request made while busy replaces any still waiting.
+
+        :return: None
+        """
+        while True:
+            with self.__lock:
+                while self.__pending is None:
+                    self.__wake.wait()
+                symbol = self.__pending
+                self.__pending = None
+            try:
+                self.prefetch(symbol)
+                self.prefetched += 1
+                logging.debug(f"Prefetched {symbol}.")
+            except Exception as error:
+                logging.warning(f"Failure to prefetch {symbol}: {error}")
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,246 @@
+"""
+.. module:: snapshot
+   :platform: Unix, Windows
+   :synopsis: Binary snapshot cache of the stock universe.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Persists the parsed stock universe, with its sort indexes, as one memory mapped file next to the
+    constituents file, so later starts skip parsing and sorting it.
+"""
+
+# From the Python Standard Library
+import logging
+import mmap
+import os
+
+# From NumPy
+import numpy as np
+
+# From libstocks
+from .universe import DATA_FILE, Universe
+
+# Bumped whenever the snapshot layout or the parsing changes.
+VERSION = 2
+
+# Offset alignment of the arrays in the data file.
+ALIGNMENT = 64
+
+
+def directory(path) -> str:
+    """
+    Returns the snapshot directory of a constituents file.
+
+    :param path: Constituents csv file.
+    :type path: str
+
+    :return: Snapshot directory, next to the file.
+    :rtype: str
+    """
+    return os.path.splitext(path)[0] + ".snapshot"
+
+
+def digest(path) -> str:
+    """
+    Returns the SHA-256 of a file.
+
+    :param path: File.
+    :type path: str
+
+    :return: Hex digest.
+    :rtype: str
+    """
+    # Imported here as it is only needed when writing a snapshot or when the
+    # file's modification time changed, not on the common path.
+    import hashlib
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 16), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def arrays(universe) -> dict:
+    """
+    Returns the arrays stored in the snapshot of a universe, its columns and the sort order of each numeric column.
+
+    :param universe: Universe.
+    :type universe: Universe
+
+    :return: Arrays by name, orders stored as order_<column>.
+    :rtype: dict[str, numpy.ndarray]
+    """
+    stored = {name: getattr(universe, name) for name in Universe.COLUMNS}
+    for name, order in universe.orders.items():
+        stored[f"order_{name}"] = order
+    return stored
+
+
+def write_meta(path, meta) -> None:
+    """
+    Writes the metadata of a snapshot through a temporary file renamed into place. One tab separated record per
+    line, so that reading it needs no parser beyond str.split.
+
+    :param path: Metadata file.
+    :type path: str
+    :param meta: Version, source file modification time, size and hash, arrays as name, dtype, offset and length,
+        and sector names.
+    :type meta: dict
+
+    :return: None
+    """
+    lines = [
+        f"version\t{meta['version']}",
+        f"source\t{meta['mtime_ns']}\t{meta['size']}\t{meta['sha256']}",
+    ]
+    lines += ["array\t" + "\t".join(map(str, array)) for array in meta["arrays"]]
+    lines += [f"sector\t{sector}" for sector in meta["sectors"]]
+    temporary = path + ".tmp"
+    with open(temporary, "w") as file:
+        file.write("\n".join(lines) + "\n")
+    os.replace(temporary, path)
+
+
+def read_meta(path) -> dict:
+    """
+    Reads the metadata written by write_meta.
+
+    :param path: Metadata file.
+    :type path: str
+
+    :return: Metadata, as passed to write_meta.
+    :rtype: dict
+    """
+    meta = {"arrays": [], "sectors": []}
+    with open(path) as file:
+        for line in file.read().splitlines():
+            key, *values = line.split("\t")
+            if "version" == key:
+                meta["version"] = int(values[0])
+            elif "source" == key:
+                meta["mtime_ns"], meta["size"] = int(values[0]), int(values[1])
+                meta["sha256"] = values[2]
+            elif "array" == key:
+                name, dtype, offset, length = values
+                meta["arrays"].append((name, dtype, int(offset), int(length)))
+            elif "sector" == key:
+                meta["sectors"].append(values[0])
+    return meta
+
+
+def save(universe, path) -> None:
+    """
+    Writes the snapshot of a universe parsed from a constituents file. The arrays are written back to back, aligned,
+    to one data file through a temporary file renamed into place, and the metadata, written last, is what marks the
+    snapshot valid.
+
+    :param universe: Universe parsed from the file.
+    :type universe: Universe
+    :param path: Constituents csv file the universe was parsed from.
+    :type path: str
+
+    :return: None
+    """
+    folder = directory(path)
+    os.makedirs(folder, exist_ok=True)
+    meta_file = os.path.join(folder, "meta.txt")
+    # Invalidate the old snapshot before touching its data.
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+    layout = []
+    temporary = os.path.join(folder, "data.tmp")
+    with open(temporary, "wb") as file:
+        for name, array in arrays(universe).items():
+            array = np.ascontiguousarray(array)
+            file.write(b"\0" * (-file.tell() % ALIGNMENT))
+            layout.append((name, array.dtype.str, file.tell(), len(array)))
+            file.write(array.tobytes())
+    os.replace(temporary, os.path.join(folder, "data.bin"))
+    status = os.stat(path)
+    meta = {
+        "version": VERSION,
+        "mtime_ns": status.st_mtime_ns,
+        "size": status.st_size,
+        "sha256": digest(path),
+        "arrays": layout,
+        "sectors": universe.sectors,
+    }
+    write_meta(meta_file, meta)
+    logging.info(f"Stock universe snapshot written to {folder}.")
+
+
+def read(path):
+    """
+    Maps the snapshot of a constituents file, if there is a valid one. A snapshot is valid if it was written by this
+    version and the file's modification time and size are unchanged or, failing that, its hash is.
+
+    :param path: Constituents csv file.
+    :type path: str
+
+    :return: Universe backed by read only memory mapped arrays, or None if there is no valid snapshot.
+    :rtype: Universe
+    """
+    if not os.path.exists(path):
+        return None
+    folder = directory(path)
+    meta_file = os.path.join(folder, "meta.txt")
+    try:
+        meta = read_meta(meta_file)
+        if VERSION != meta.get("version"):
+            return None
+        source = (meta["mtime_ns"], meta["size"])
+    except (OSError, ValueError, IndexError, KeyError):
+        return None
+    status = os.stat(path)
+    if (status.st_mtime_ns, status.st_size) != source:
+        if digest(path) != meta["sha256"]:
+            logging.info(f"Stock universe snapshot of {path} is stale.")
+            return None
+        # Only the modification time changed, e.g. the file was copied.
+        meta["mtime_ns"] = status.st_mtime_ns
+        meta["size"] = status.st_size
+        try:
+            write_meta(meta_file, meta)
+        except OSError:
+            pass
+    try:
+        with open(os.path.join(folder, "data.bin"), "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        stored = {
+            name: np.frombuffer(data, dtype=dtype, count=length, offset=offset)
+            for name, dtype, offset, length in meta["arrays"]
+        }
+        columns = {name: stored[name] for name in Universe.COLUMNS}
+        orders = {name: stored[f"order_{name}"] for name in Universe.NUMERIC}
+    except (OSError, ValueError, TypeError, KeyError):
+        logging.warning(f"Stock universe snapshot in {folder} is unreadable.")
+        return None
+    return Universe(sectors=meta["sectors"], orders=orders, **columns)
+
+
+def load(path=DATA_FILE):
+    """
+    Loads the universe of a constituents file from its snapshot, parsing the file and writing the snapshot first if
+    there is no valid one. A snapshot that cannot be written is only logged.
+
+    :param path: Constituents csv file, defaults to the bundled Russell 1000 file.
+    :type path: str, optional
+
+    :return: Universe.
+    :rtype: Universe
+    """
+    universe = read(path)
+    if universe is not None:
+        logging.info(f"Stock universe mapped from snapshot of {path}.")
+        return universe
+    universe = Universe.from_csv(path)
+    try:
+        save(universe, path)
+    except OSError as error:
+        logging.warning(f"Failure to write stock universe snapshot: {error}")
+    return universe
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
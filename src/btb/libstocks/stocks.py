@@ -9,50 +9,39 @@
 """
 
 # From the Python Standard Library
-import os
 from random import randrange
 import logging
 
-# From the pandas library
-from pandas import read_csv
+# From libstocks
+from .universe import universe
 
 
 class Stocks:
     """
     Provides stock data for a selected stock from the top 1000 measured by market capitial.
 
+    A Stocks object is only a row number into the shared, columnar stock universe, so creating one is cheap.
+
     :param index: Index for selected stock into the list of stocks sorted by market capitalization. If not specified a random index will be selected, defaults to None.
     :type index: int
+    :param stocks: Stock universe to select from, defaults to the shared Russell 1000 universe.
+    :type stocks: Universe, optional
     """
 
-    __data_file = os.path.join(
-        os.path.dirname(os.path.realpath(__file__)), "data/Russell1000Index.csv"
-    )
-    if not os.path.exists(__data_file):
-        logging.error(f"Invalid file path: {__data_file}")
-        raise Exception(f"Invalid file path: {__data_file}")
-
-    __data = read_csv(__data_file)
+    __slots__ = ("index", "__universe")
 
-    def __init__(self, index=None):
+    def __init__(self, index=None, stocks=None):
         """
         Constructor method.
         """
-        MAX_INDEX = 999
-        if MAX_INDEX < index:
+        self.__universe = stocks if stocks is not None else universe()
+        if None == index:
+            index = randrange(len(self.__universe))
+        elif not 0 <= index < len(self.__universe):
             logging.error(f"Invalid passed index: {index}")
             raise ValueError(f"Invalid passed index: {index}")
-        elif None != index:
-            self.index = index
-        else:
-            self.index = randrange(MAX_INDEX)
+        self.index = index
         logging.debug(f"Stock index selected: {self.index}")
-        self.__country = self.__data.Country[self.index]
-        self.__description = self.__data.Description[self.index]
-        self.__divdend = self.__data.DividendYield[self.index]
-        self.__market_cap = self.__data.MarketCap[self.index]
-        self.__sector = self.__data.GICSSector[self.index]
-        self.__symbol = self.__data.Symbol[self.index]
 
     @property
     def country(self) -> str:
@@ -62,7 +51,7 @@ class Stocks:
 
         :return: Country.
         """
-        return self.__country
+        return str(self.__universe.country[self.index])
 
     @property
     def description(self) -> str:
@@ -71,17 +60,17 @@ class Stocks:
 
         :return: Stock description.
         """
-        return self.__description
+        return str(self.__universe.description[self.index])
 
     @property
-    def divdend(self) -> str:
+    def divdend(self) -> float:
         """
         Returns the dividend yield of the selected stock.
         A dividend is a distribution of a portion of a company's earnings, decided by the board of directors, paid to a class of its shareholders.
 
-        :return: Dividend yield.
+        :return: Dividend yield in percent.
         """
-        return self.__divdend
+        return float(self.__universe.dividend_yield[self.index])
 
     def find_ticker_by_instrument_id(self, instrument_id) -> str:
         """
@@ -92,18 +81,21 @@ class Stocks:
 
         :return: Stock ticker.
         """
-        ticker_data = self.__data.loc[self.__data["Symbol"] == instrument_id]
-        return ticker_data["Symbol"][0]
+        row = self.__universe.by_instrument_id.get(instrument_id)
+        if row is None:
+            logging.error(f"Unknown instrument ID: {instrument_id}")
+            raise ValueError(f"Unknown instrument ID: {instrument_id}")
+        return str(self.__universe.symbol[row])
 
     @property
-    def market_cap(self) -> str:
+    def market_cap(self) -> int:
         """
         Returns the market capitalization of the selected stock.
         Market capitalization is the total dollar value of all outstanding shares of a company at the current market price.
 
-        :return: Market capitalization.
+        :return: Market capitalization in dollars.
         """
-        return self.__market_cap
+        return int(self.__universe.market_cap[self.index])
 
     @property
     def sector(self) -> str:
@@ -125,7 +117,7 @@ class Stocks:
 
         :return: Sector.
         """
-        return self.__sector
+        return self.__universe.sector_name(self.index)
 
     def size(self) -> int:
         """
@@ -133,7 +125,7 @@ class Stocks:
 
         :return: The number of elements in the data set.
         """
-        return self.__data.shape[0]
+        return len(self.__universe)
 
     @property
     def symbol(self) -> str:
@@ -144,7 +136,7 @@ class Stocks:
 
         :return: Symbol.
         """
-        return self.__symbol
+        return str(self.__universe.symbol[self.index])
 
 
 if __name__ == "__main__":
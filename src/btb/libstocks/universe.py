@@ -0,0 +1,358 @@
+"""
+.. module:: universe
+   :platform: Unix, Windows
+   :synopsis: Columnar in-memory store of the stock universe.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Columnar in-memory store of the stock universe with hash indexes by symbol and instrument ID.
+"""
+
+# From the Python Standard Library
+import csv
+import logging
+import os
+
+# From NumPy
+import numpy as np
+
+DATA_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "data/Russell1000Index.csv"
+)
+
+
+def parse_market_cap(text) -> int:
+    """
+    Parses a market capitalization such as "$2,336,425,290,660".
+
+    :param text: Market capitalization.
+    :type text: str
+
+    :return: Market capitalization in dollars.
+    :rtype: int
+    """
+    return int(text.replace("$", "").replace(",", ""))
+
+
+def parse_percent(text) -> float:
+    """
+    Parses a percentage such as "0.62%".
+
+    :param text: Percentage.
+    :type text: str
+
+    :return: Percentage, e.g. 0.62.
+    :rtype: float
+    """
+    return float(text.rstrip("%"))
+
+
+def parse_record(row) -> tuple:
+    """
+    Parses a constituent record into the values of the universe's columns, with the sector as its name.
+
+    :param row: Record with the Symbol, Description, GICSSector, MarketCap, DividendYield, Country and InstrumentId
+        fields of the constituents file.
+    :type row: dict
+
+    :return: Values in the order of Universe.COLUMNS.
+    :rtype: tuple
+    """
+    return (
+        row["Symbol"].strip(),
+        row["Description"].strip(),
+        # The file is not consistent about capitalization of sectors,
+        # e.g. both "Information Technology" and "Information technology".
+        row["GICSSector"].strip().title(),
+        parse_market_cap(row["MarketCap"]),
+        parse_percent(row["DividendYield"]),
+        row["Country"].strip(),
+        row["InstrumentId"].strip(),
+    )
+
+
+class Universe:
+    """
+    The stock universe held as one typed numpy array per column, with rows in the order of the constituents file.
+    Market capitalization and dividend yield are parsed once into numbers and sectors are stored as small integer
+    codes into sectors. by_symbol and by_instrument_id map to row numbers.
+
+    For queries, orders holds the rows sorted by each numeric column, ordered the column's values in that order, and
+    sector_masks a boolean row mask per sector code.
+
+    :param symbol: Ticker of each stock.
+    :type symbol: numpy.ndarray
+    :param description: Company name of each stock.
+    :type description: numpy.ndarray
+    :param sector: Code of each stock's sector in sectors.
+    :type sector: numpy.ndarray
+    :param sectors: Sector names.
+    :type sectors: tuple[str]
+    :param market_cap: Market capitalization of each stock in dollars.
+    :type market_cap: numpy.ndarray
+    :param dividend_yield: Dividend yield of each stock in percent.
+    :type dividend_yield: numpy.ndarray
+    :param country: Country of each stock.
+    :type country: numpy.ndarray
+    :param instrument_id: Robinhood instrument ID of each stock.
+    :type instrument_id: numpy.ndarray
+    :param by_symbol: Row of each symbol, defaults to building it from symbol.
+    :type by_symbol: dict, optional
+    :param by_instrument_id: Row of each instrument ID, defaults to building it from instrument_id.
+    :type by_instrument_id: dict, optional
+    :param orders: Rows sorted by each numeric column, defaults to sorting them.
+    :type orders: dict[str, numpy.ndarray], optional
+    """
+
+    COLUMNS = (
+        "symbol",
+        "description",
+        "sector",
+        "market_cap",
+        "dividend_yield",
+        "country",
+        "instrument_id",
+    )
+
+    # Columns that can be filtered by range and sorted on.
+    NUMERIC = ("market_cap", "dividend_yield")
+
+    def __init__(
+        self,
+        symbol,
+        description,
+        sector,
+        sectors,
+        market_cap,
+        dividend_yield,
+        country,
+        instrument_id,
+        by_symbol=None,
+        by_instrument_id=None,
+        orders=None,
+    ):
+        """
+        Constructor method.
+        """
+        self.symbol = symbol
+        self.description = description
+        self.sector = sector
+        self.sectors = tuple(sectors)
+        self.market_cap = market_cap
+        self.dividend_yield = dividend_yield
+        self.country = country
+        self.instrument_id = instrument_id
+        if by_symbol is None:
+            by_symbol = {value: row for row, value in enumerate(symbol.tolist())}
+        if by_instrument_id is None:
+            by_instrument_id = {
+                value: row for row, value in enumerate(instrument_id.tolist())
+            }
+        self.by_symbol = by_symbol
+        self.by_instrument_id = by_instrument_id
+        if len(self.by_symbol) != len(symbol):
+            logging.warning("Stock universe contains duplicate symbols.")
+        if orders is None:
+            orders = {
+                name: np.argsort(getattr(self, name), kind="stable")
+                for name in self.NUMERIC
+            }
+        self.orders = orders
+        self.ordered = {
+            name: np.asarray(getattr(self, name))[order]
+            for name, order in self.orders.items()
+        }
+        self.sector_masks = np.arange(len(self.sectors))[:, np.newaxis] == np.asarray(
+            sector
+        )
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds the universe from constituent records.
+
+        :param rows: Records with the Symbol, Description, GICSSector, MarketCap, DividendYield, Country and
+            InstrumentId fields of the constituents file.
+        :type rows: iterable[dict]
+
+        :return: Universe.
+        :rtype: Universe
+        """
+        columns = {name: [] for name in cls.COLUMNS}
+        codes = {}
+        for row in rows:
+            for name, value in zip(cls.COLUMNS, parse_record(row)):
+                if "sector" == name:
+                    value = codes.setdefault(value, len(codes))
+                columns[name].append(value)
+        return cls(
+            np.array(columns["symbol"], dtype=str),
+            np.array(columns["description"], dtype=str),
+            np.array(columns["sector"], dtype=np.uint8),
+            list(codes),
+            np.array(columns["market_cap"], dtype=np.int64),
+            np.array(columns["dividend_yield"], dtype=np.float64),
+            np.array(columns["country"], dtype=str),
+            np.array(columns["instrument_id"], dtype=str),
+        )
+
+    @classmethod
+    def from_csv(cls, path=DATA_FILE):
+        """
+        Parses a constituents file.
+
+        :param path: Constituents csv file, defaults to the bundled Russell 1000 file.
+        :type path: str, optional
+
+        :return: Universe.
+        :rtype: Universe
+        """
+        if not os.path.exists(path):
+            logging.error(f"Invalid file path: {path}")
+            raise Exception(f"Invalid file path: {path}")
+        with open(path, newline="") as file:
+            universe = cls.from_rows(csv.DictReader(file))
+        logging.info(f"Stock universe loaded from {path}, {len(universe)} stocks.")
+        return universe
+
+    def __len__(self) -> int:
+        """
+        Returns the number of stocks in the universe.
+
+        :return: Number of stocks.
+        :rtype: int
+        """
+        return len(self.symbol)
+
+    def sector_name(self, row) -> str:
+        """
+        Returns the sector name of a row.
+
+        :param row: Row number.
+        :type row: int
+
+        :return: Sector.
+        :rtype: str
+        """
+        return self.sectors[self.sector[row]]
+
+    def record(self, row) -> tuple:
+        """
+        Returns the values of a row, with the sector as its name, as parse_record does for the constituents file.
+
+        :param row: Row number.
+        :type row: int
+
+        :return: Values in the order of COLUMNS.
+        :rtype: tuple
+        """
+        return (
+            str(self.symbol[row]),
+            str(self.description[row]),
+            self.sector_name(row),
+            int(self.market_cap[row]),
+            float(self.dividend_yield[row]),
+            str(self.country[row]),
+            str(self.instrument_id[row]),
+        )
+
+    def patch(self, changed=None, removed=(), added=(), order=None):
+        """
+        Returns a new universe with rows changed, removed and added, leaving this one untouched for anyone still
+        reading it.
+
+        Removed rows are dropped with a mask, so the remaining rows keep their relative order, and added rows are
+        appended. If order is given the rows are then laid out in it, e.g. the order of a refreshed constituents
+        file, so that rotations through the rows follow the file. The symbol and instrument ID indexes are rebuilt
+        from the new arrays. Row numbers of the new universe are therefore only meaningful for it, map stocks across
+        by symbol.
+
+        :param changed: New values, as from parse_record, of existing rows by row number, defaults to None.
+        :type changed: dict[int, tuple], optional
+        :param removed: Row numbers to remove, defaults to none.
+        :type removed: iterable[int], optional
+        :param added: Values, as from parse_record, of new rows, defaults to none.
+        :type added: iterable[tuple], optional
+        :param order: Symbols of every row of the new universe in the order to lay them out, defaults to None.
+        :type order: list[str], optional
+
+        :return: Universe.
+        :rtype: Universe
+        """
+        # Copies, as the arrays of this universe may be read only snapshots.
+        columns = {name: np.array(getattr(self, name)) for name in self.COLUMNS}
+        codes = {name: code for code, name in enumerate(self.sectors)}
+
+        def store(row, values):
+            for name, value in zip(self.COLUMNS, values):
+                if "sector" == name:
+                    value = codes.setdefault(value, len(codes))
+                column = columns[name]
+                # Widen string columns rather than truncate longer values.
+                if "U" == column.dtype.kind and len(value) > column.dtype.itemsize // 4:
+                    column = columns[name] = column.astype(f"<U{len(value)}")
+                column[row] = value
+
+        for row, values in (changed or {}).items():
+            store(row, values)
+
+        keep = np.ones(len(self), dtype=bool)
+        keep[list(removed)] = False
+        size = int(keep.sum())
+        added = list(added)
+        for name in self.COLUMNS:
+            columns[name] = np.resize(columns[name][keep], size + len(added))
+        for row, values in enumerate(added, size):
+            store(row, values)
+        patched = Universe(sectors=list(codes), **columns)
+        if order is None:
+            return patched
+        rows = [patched.by_symbol[symbol] for symbol in order]
+        if len(rows) != len(patched):
+            logging.error("Stock universe order does not cover every row.")
+            raise ValueError("Stock universe order does not cover every row.")
+        return Universe(
+            sectors=list(codes),
+            **{name: columns[name][rows] for name in self.COLUMNS},
+        )
+
+
+# Universe shared by every Stocks view, loaded on first use.
+_universe = None
+
+
+def universe():
+    """
+    Returns the shared stock universe, loading it on first use from the snapshot cache.
+
+    :return: Universe.
+    :rtype: Universe
+    """
+    global _universe
+    if _universe is None:
+        # Imported here as the snapshot module builds on this one.
+        from .snapshot import load
+
+        _universe = load()
+    return _universe
+
+
+def replace(new):
+    """
+    Makes another universe the shared one. Readers are not blocked: the swap is a single reference assignment, so
+    callers of universe() get either the old or the new universe, and views already holding the old one keep reading
+    it consistently.
+
+    :param new: Universe.
+    :type new: Universe
+
+    :return: The universe replaced, None if none was loaded.
+    :rtype: Universe
+    """
+    global _universe
+    old, _universe = _universe, new
+    return old
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,56 @@
+"""
+.. module:: account
+   :platform: Unix, Windows
+   :synopsis: Point in time view of a Robinhood account.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Point in time view of a Robinhood account's buying power and equity, fetched once and shared by every step
+    of a trade.
+"""
+
+# From the Python Standard Library
+import time
+
+
+class AccountSnapshot:
+    """
+    The account and portfolio as fetched at one point in time.
+
+    :param rh: Signed in Robinhood session.
+    :type rh: Robinhood
+    """
+
+    def __init__(self, rh):
+        """
+        Constructor method.
+        """
+        self.fetched = time.monotonic()
+        self.account = rh.get_account()
+        self.portfolio = rh.portfolios()
+        self.buying_power = float(self.account["buying_power"])
+        self.equity = float(self.portfolio["equity"])
+
+    @property
+    def age(self) -> float:
+        """
+        Returns the seconds since the snapshot was fetched.
+
+        :return: Age in seconds.
+        :rtype: float
+        """
+        return time.monotonic() - self.fetched
+
+    @property
+    def liquidity(self) -> float:
+        """
+        Returns the fraction of the account's equity available as buying power.
+
+        :return: Liquidity, e.g. 0.1 for $10 of buying power in a $100 account.
+        :rtype: float
+        """
+        return self.buying_power / self.equity
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
@@ -0,0 +1,169 @@
+"""
+.. module:: executor
+   :platform: Unix, Windows
+   :synopsis: Background execution of orders.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Runs orders on a worker thread so that placing them never stalls the caller, one at a time and in the order
+    submitted.
+"""
+
+# From the Python Standard Library
+from collections import deque
+from concurrent.futures import Future
+import logging
+import threading
+import time
+
+
+class OrderExecutor:
+    """
+    Runs submitted calls, e.g. Trading methods, on a worker thread. submit() returns at once with a future of the
+    call's result.
+
+    Calls run one at a time in the order submitted, so a call placing several orders, e.g. selling to free up funds
+    and then buying, runs without any other order in between. Submitting a call identical to one that has not finished
+    yet, the same function with the same arguments, returns the future of that call instead of queueing it again.
+
+    The counters are submitted, calls queued, deduplicated, calls answered with the future of an identical one,
+    completed and failed. latencies holds the most recent calls' description, seconds queued and seconds running.
+
+    :param history: Number of latencies kept, defaults to 100.
+    :type history: int, optional
+    """
+
+    def __init__(self, history=100):
+        """
+        Constructor method.
+        """
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=history)
+        self.__lock = threading.Lock()
+        self.__wake = threading.Condition(self.__lock)
+        # Calls waiting, and the future of each call not finished yet by
+        # function and arguments.
+        self.__queue = deque()
+        self.__futures = {}
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name="orders", daemon=True)
+        self.__thread.start()
+
+    @property
+    def pending(self) -> int:
+        """
+        Returns the number of calls queued or running.
+
+        :return: Number of calls.
+        :rtype: int
+        """
+        with self.__lock:
+            return len(self.__futures)
+
+    def submit(self, function, *args) -> Future:
+        """
+        Queues a call. Returns immediately.
+
+        :param function: Function to call, e.g. Trading.buy_with_current_funds.
+        :type function: callable
+        :param args: Arguments to call it with, which must be hashable.
+        :type args: object
+
+        :return: Future of the call's result.
+        :rtype: concurrent.futures.Future
+        """
+        key = (function, args)
+        with self.__lock:
+            if self.__closed:
+                logging.error("Order submitted to a closed executor.")
+                raise Exception("Order submitted to a closed executor.")
+            future = self.__futures.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                logging.info(f"Order {self.__describe(key)} already pending.")
+                return future
+            future = Future()
+            self.__futures[key] = future
+            self.__queue.append((key, future, time.perf_counter()))
+            self.submitted += 1
+            self.__wake.notify()
+        return future
+
+    @staticmethod
+    def __describe(key) -> str:
+        """
+        Describes a call for the log.
+
+        :param key: Function and arguments.
+        :type key: tuple
+
+        :return: Description, e.g. buy_with_current_funds('AAPL').
+        :rtype: str
+        """
+        function, args = key
+        name = getattr(function, "__name__", repr(function))
+        return f"{name}({', '.join(map(repr, args))})"
+
+    def __run(self) -> None:
+        """
+        Worker thread. Runs queued calls until closed.
+
+        :return: None
+        """
+        while True:
+            with self.__lock:
+                while not self.__queue and not self.__closed:
+                    self.__wake.wait()
+                if not self.__queue:
+                    return
+                key, future, queued = self.__queue.popleft()
+            function, args = key
+            started = time.perf_counter()
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = function(*args)
+                except Exception as error:
+                    logging.error(f"Order {self.__describe(key)} failed: {error}")
+                    future.set_exception(error)
+                    failed = True
+                else:
+                    future.set_result(result)
+                    failed = False
+            else:
+                failed = None
+            finished = time.perf_counter()
+            with self.__lock:
+                del self.__futures[key]
+                if failed is not None:
+                    self.completed += not failed
+                    self.failed += failed
+                    self.latencies.append(
+                        (self.__describe(key), started - queued, finished - started)
+                    )
+            if failed is not None:
+                logging.info(
+                    f"Order {self.__describe(key)} took {(finished - queued) * 1000:.0f} ms, "
+                    f"{(started - queued) * 1000:.0f} ms of it queued."
+                )
+
+    def close(self, wait=True) -> None:
+        """
+        Stops accepting calls. The calls already queued still run.
+
+        :param wait: Wait for them to finish, defaults to True.
+        :type wait: bool, optional
+
+        :return: None
+        """
+        with self.__lock:
+            self.__closed = True
+            self.__wake.notify()
+        if wait:
+            self.__thread.join()
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
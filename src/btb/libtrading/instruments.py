@@ -0,0 +1,201 @@
+"""
+.. module:: instruments
+   :platform: Unix, Windows
+   :synopsis: Persistent cache of Robinhood instruments.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Keeps the instrument ID and URL of each stock ticker in a small sqlite database, so that orders and
+    conversions between instrument IDs and tickers do not need the network.
+"""
+
+# From the Python Standard Library
+import logging
+import os
+import sqlite3
+import threading
+
+INSTRUMENT_FILE = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "data/instruments.sqlite3"
+)
+
+INSTRUMENT_URL = "https://api.robinhood.com/instruments/{}/"
+
+
+class InstrumentCache:
+    """
+    Maps stock tickers to Robinhood instrument IDs and URLs and back. The whole database is read into memory when
+    opened, so lookups are dictionary lookups. A ticker or instrument ID that is not known yet is fetched from the API
+    once and stored for later runs.
+
+    The counters are hits, lookups answered from memory, and misses, lookups fetched from the API.
+
+    :param rh: Signed in Robinhood session used on a miss.
+    :type rh: Robinhood
+    :param path: Database file, defaults to instruments.sqlite3 in the data folder of this package.
+    :type path: str, optional
+    """
+
+    def __init__(self, rh, path=INSTRUMENT_FILE):
+        """
+        Constructor method.
+        """
+        self.rh = rh
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        self.__db.execute(
+            "CREATE TABLE IF NOT EXISTS instruments ("
+            "instrument_id TEXT PRIMARY KEY, symbol TEXT NOT NULL, url TEXT NOT NULL)"
+        )
+        # Instrument ID and URL by ticker and ticker by instrument ID.
+        self.__by_symbol = {}
+        self.__by_id = {}
+        for instrument_id, symbol, url in self.__db.execute(
+            "SELECT instrument_id, symbol, url FROM instruments ORDER BY rowid"
+        ):
+            self.__by_symbol[symbol] = (instrument_id, url)
+            self.__by_id[instrument_id] = symbol
+        logging.info(f"Instrument cache loaded from {path}, {len(self)} instruments.")
+
+    def __len__(self) -> int:
+        """
+        Returns the number of instruments known.
+
+        :return: Number of instruments.
+        :rtype: int
+        """
+        return len(self.__by_id)
+
+    def __store(self, records) -> None:
+        """
+        Adds instruments to memory and the database.
+
+        :param records: Instrument ID, ticker and URL of each instrument.
+        :type records: list[tuple[str, str, str]]
+
+        :return: None
+        """
+        with self.__lock:
+            for instrument_id, symbol, url in records:
+                self.__by_symbol[symbol] = (instrument_id, url)
+                self.__by_id[instrument_id] = symbol
+            with self.__db:
+                self.__db.executemany(
+                    "INSERT OR REPLACE INTO instruments VALUES (?, ?, ?)", records
+                )
+
+    def seed(self, symbols, instrument_ids) -> int:
+        """
+        Adds instruments not known yet from a constituents file's Symbol and InstrumentId columns. Instruments already
+        known, e.g. as fetched from the API, are left as they are.
+
+        :param symbols: Stock tickers.
+        :type symbols: iterable[str]
+        :param instrument_ids: Robinhood instrument ID of each ticker.
+        :type instrument_ids: iterable[str]
+
+        :return: Number of instruments added.
+        :rtype: int
+        """
+        records = [
+            (str(instrument_id), str(symbol), INSTRUMENT_URL.format(instrument_id))
+            for symbol, instrument_id in zip(symbols, instrument_ids)
+            if str(instrument_id) not in self.__by_id
+            and str(symbol) not in self.__by_symbol
+        ]
+        if records:
+            self.__store(records)
+            logging.info(f"Instrument cache seeded with {len(records)} instruments.")
+        return len(records)
+
+    def __fetch(self, instrument) -> tuple:
+        """
+        Stores an instrument fetched from the API.
+
+        :param instrument: Instrument data with the id, symbol and url fields.
+        :type instrument: dict
+
+        :return: Instrument ID, ticker and URL.
+        :rtype: tuple[str, str, str]
+        """
+        self.misses += 1
+        record = (instrument["id"], instrument["symbol"], instrument["url"])
+        self.__store([record])
+        logging.debug(f"Instrument {record[1]} fetched, ID {record[0]}.")
+        return record
+
+    def lookup(self, symbol) -> tuple:
+        """
+        Returns the instrument ID and URL of a stock ticker.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+
+        :return: Instrument ID and URL.
+        :rtype: tuple[str, str]
+        """
+        known = self.__by_symbol.get(symbol)
+        if known is not None:
+            self.hits += 1
+            return known
+        instrument_id, _, url = self.__fetch(self.rh.instrument(symbol))
+        return instrument_id, url
+
+    def url(self, symbol) -> str:
+        """
+        Returns the instrument URL of a stock ticker, as orders take it.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+
+        :return: Instrument URL.
+        :rtype: str
+        """
+        return self.lookup(symbol)[1]
+
+    def instrument_id(self, symbol) -> str:
+        """
+        Returns the instrument ID of a stock ticker.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+
+        :return: Instrument ID.
+        :rtype: str
+        """
+        return self.lookup(symbol)[0]
+
+    def symbol(self, instrument_id) -> str:
+        """
+        Returns the stock ticker of an instrument ID.
+
+        :param instrument_id: Robinhood instrument ID.
+        :type instrument_id: str
+
+        :return: Stock ticker (symbol).
+        :rtype: str
+        """
+        known = self.__by_id.get(instrument_id)
+        if known is not None:
+            self.hits += 1
+            return known
+        return self.__fetch(self.rh.get_url(INSTRUMENT_URL.format(instrument_id)))[1]
+
+    def close(self) -> None:
+        """
+        Closes the database.
+
+        :return: None
+        """
+        with self.__lock:
+            self.__db.close()
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
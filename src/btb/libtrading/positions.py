@@ -0,0 +1,271 @@
+"""
+.. module:: positions
+   :platform: Unix, Windows
+   :synopsis: In memory book of the positions held.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Keeps the positions held in memory, updated from our own orders and reconciled with Robinhood in the
+    background, so that ownership checks and finding the least recently purchased stock need no network call.
+"""
+
+# From the Python Standard Library
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+# Order states after which no more shares of the order fill.
+FINAL_STATES = ("filled", "cancelled", "rejected", "failed")
+
+
+def parse_time(text) -> float:
+    """
+    Parses a Robinhood timestamp such as "2021-06-01T14:30:00.123456Z".
+
+    :param text: Timestamp.
+    :type text: str
+
+    :return: Seconds since the epoch.
+    :rtype: float
+    """
+    return datetime.datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+
+
+def instrument_id(position) -> str:
+    """
+    Returns the instrument ID of a position record, from its instrument_id field or else the end of its URL.
+
+    :param position: Position record.
+    :type position: dict
+
+    :return: Instrument ID.
+    :rtype: str
+    """
+    if position.get("instrument_id"):
+        return position["instrument_id"]
+    return position["url"].strip("/").rsplit("/")[-1]
+
+
+class PositionBook:
+    """
+    The positions held, by instrument ID, with the quantity and time last updated of each.
+
+    A heap orders the positions by time last updated, so that the least recently purchased one is found in
+    logarithmic time. Updates push a new heap entry rather than moving the old one, which is left in place and skipped
+    once it reaches the top.
+
+    Orders placed update the book right away with the shares their response reports filled. Orders not final yet, e.g.
+    still queued or partly filled, trigger a reconciliation settle seconds later. Every reconcile_interval seconds a
+    background thread also replaces the book with the positions Robinhood reports.
+
+    :param fetch: Called without arguments to fetch the position records held, e.g. from
+        Robinhood.securities_owned().
+    :type fetch: callable
+    :param reconcile_interval: Seconds between reconciliations, None to only reconcile when reconcile() is called or
+        after an order that was not final, defaults to 300.
+    :type reconcile_interval: float, optional
+    :param settle: Seconds to wait after an order that was not final before reconciling, defaults to 5.
+    :type settle: float, optional
+    """
+
+    def __init__(self, fetch, reconcile_interval=300.0, settle=5.0):
+        """
+        Constructor method.
+        """
+        self.fetch = fetch
+        self.reconcile_interval = reconcile_interval
+        self.settle = settle
+        self.reconciled = None
+        self.__lock = threading.Lock()
+        # Quantity and time last updated by instrument ID, and heap entries
+        # of time last updated, a tie breaker and the instrument ID.
+        self.__positions = {}
+        self.__heap = []
+        self.__counter = itertools.count()
+        # Changes made by orders, so that a reconciliation overlapping one
+        # can be discarded.
+        self.__changes = 0
+        # Set when an order that was not final wants a reconciliation.
+        self.__wake = threading.Event()
+        self.reconcile()
+        threading.Thread(target=self.__run, name="positions", daemon=True).start()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of positions held.
+
+        :return: Number of positions.
+        :rtype: int
+        """
+        return len(self.__positions)
+
+    def __set(self, instrument, quantity, updated) -> None:
+        """
+        Sets a position, removing it if its quantity is zero. Must be called with the lock held.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+        :param quantity: Shares held.
+        :type quantity: float
+        :param updated: Time last updated in seconds since the epoch.
+        :type updated: float
+
+        :return: None
+        """
+        if quantity <= 0:
+            self.__positions.pop(instrument, None)
+            return
+        self.__positions[instrument] = (quantity, updated)
+        heapq.heappush(self.__heap, (updated, next(self.__counter), instrument))
+
+    def reconcile(self) -> bool:
+        """
+        Replaces the book with the positions fetched. The result is discarded if an order updated the book while
+        fetching, the next reconciliation picks it up.
+
+        :return: True if the book was replaced, false if the result was discarded.
+        :rtype: bool
+        """
+        with self.__lock:
+            changes = self.__changes
+        positions = self.fetch()
+        with self.__lock:
+            if changes != self.__changes:
+                logging.info("Position reconciliation overlapped an order, skipped.")
+                return False
+            self.__positions = {}
+            self.__heap = []
+            for position in positions:
+                self.__set(
+                    instrument_id(position),
+                    float(position["quantity"]),
+                    parse_time(position["updated_at"]),
+                )
+            self.reconciled = time.monotonic()
+        logging.debug(f"Positions reconciled, {len(self)} held.")
+        return True
+
+    def __run(self) -> None:
+        """
+        Reconciliation thread.
+
+        :return: None
+        """
+        while True:
+            if self.__wake.wait(self.reconcile_interval):
+                self.__wake.clear()
+                # Give the order time to fill.
+                time.sleep(self.settle)
+            try:
+                if not self.reconcile():
+                    self.__wake.set()
+            except Exception as error:
+                logging.warning(f"Failure to reconcile positions: {error}")
+
+    def bought(self, instrument, quantity) -> None:
+        """
+        Records shares bought.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+        :param quantity: Shares bought.
+        :type quantity: float
+
+        :return: None
+        """
+        with self.__lock:
+            held, _ = self.__positions.get(instrument, (0.0, None))
+            self.__set(instrument, held + quantity, time.time())
+            self.__changes += 1
+
+    def sold(self, instrument, quantity) -> None:
+        """
+        Records shares sold.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+        :param quantity: Shares sold.
+        :type quantity: float
+
+        :return: None
+        """
+        with self.__lock:
+            held, _ = self.__positions.get(instrument, (0.0, None))
+            self.__set(instrument, held - quantity, time.time())
+            self.__changes += 1
+
+    def record(self, instrument, order, side) -> float:
+        """
+        Records an order placed from its response: the shares filled so far are bought or sold right away and, unless
+        the order is final, a reconciliation settle seconds later picks up the rest.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+        :param order: Order response, with the order's state and cumulative_quantity filled, None if there was none.
+        :type order: dict
+        :param side: Either "buy" or "sell".
+        :type side: str
+
+        :return: Shares filled so far.
+        :rtype: float
+        """
+        order = order or {}
+        filled = float(order.get("cumulative_quantity") or 0.0)
+        if filled:
+            if "buy" == side:
+                self.bought(instrument, filled)
+            else:
+                self.sold(instrument, filled)
+        if order.get("state") not in FINAL_STATES:
+            self.__wake.set()
+        return filled
+
+    def owns(self, instrument) -> bool:
+        """
+        Returns whether any shares of an instrument are held.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+
+        :return: True if held.
+        :rtype: bool
+        """
+        with self.__lock:
+            return instrument in self.__positions
+
+    def quantity(self, instrument) -> float:
+        """
+        Returns the shares of an instrument held.
+
+        :param instrument: Instrument ID.
+        :type instrument: str
+
+        :return: Shares held, 0 if none.
+        :rtype: float
+        """
+        with self.__lock:
+            return self.__positions.get(instrument, (0.0, None))[0]
+
+    def least_recently_purchased(self):
+        """
+        Returns the position updated longest ago.
+
+        :return: Instrument ID and shares held, None if nothing is held.
+        :rtype: tuple[str, float]
+        """
+        with self.__lock:
+            while self.__heap:
+                updated, _, instrument = self.__heap[0]
+                quantity, current = self.__positions.get(instrument, (None, None))
+                if current == updated:
+                    return instrument, quantity
+                # Superseded by a later update or no longer held.
+                heapq.heappop(self.__heap)
+        return None
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
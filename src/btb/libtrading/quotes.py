@@ -0,0 +1,225 @@
+"""
+.. module:: quotes
+   :platform: Unix, Windows
+   :synopsis: Time limited cache of stock quotes.
+
+.. moduleauthor:: Samuel Mehalko <samuel.mehalko@gmail.com>
+
+:synopis: Caches stock quotes for a limited time, shares one fetch between concurrent callers for the same symbol and
+    optionally keeps one symbol's quote fresh in the background.
+"""
+
+# From the Python Standard Library
+import logging
+import threading
+import time
+
+
+class QuoteCache:
+    """
+    Caches quotes by symbol, each for ttl seconds after it was fetched.
+
+    A caller asking for a symbol whose quote is missing or too old fetches it, and callers asking for the same symbol
+    meanwhile wait for that fetch instead of starting their own. watch() keeps the quote of one symbol, e.g. the one
+    on screen, refreshed in the background, so a trade in it can price from a quote about interval seconds old at most
+    without waiting on a fetch.
+
+    The counters are hits, fresh quotes returned from the cache, misses, symbols not cached, stale, symbols cached but
+    too old, coalesced, callers that waited on another caller's fetch, fetches, errors, failed fetches, and refreshes,
+    fetches made by the background refresher.
+
+    :param fetch: Called with a symbol to fetch its quote, e.g. Robinhood.get_quote.
+    :type fetch: callable
+    :param ttl: Seconds a quote is reused for, defaults to 2.
+    :type ttl: float, optional
+    """
+
+    def __init__(self, fetch, ttl=2.0):
+        """
+        Constructor method.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.fetches = 0
+        self.errors = 0
+        self.refreshes = 0
+        self.__lock = threading.Lock()
+        # Latest quote by symbol with the time it was fetched, and the
+        # symbols being fetched with an event set once they are.
+        self.__quotes = {}
+        self.__inflight = {}
+        self.__watched = None
+        self.__interval = None
+        self.__wake = threading.Event()
+        self.__thread = None
+
+    def age(self, symbol):
+        """
+        Returns the age of the cached quote of a symbol.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+
+        :return: Seconds since the quote was fetched, None if there is none.
+        :rtype: float
+        """
+        with self.__lock:
+            fetched, _ = self.__quotes.get(symbol, (None, None))
+        return None if fetched is None else time.monotonic() - fetched
+
+    def get(self, symbol, max_age=None) -> dict:
+        """
+        Returns the quote of a symbol, fetching it if the cached one is missing or too old.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+        :param max_age: Seconds old the quote may be at most, defaults to ttl.
+        :type max_age: float, optional
+
+        :return: Quote.
+        :rtype: dict
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self.__lock:
+            fetched, quote = self.__quotes.get(symbol, (None, None))
+            if fetched is not None and time.monotonic() - fetched <= max_age:
+                self.hits += 1
+                return quote
+            if fetched is None:
+                self.misses += 1
+            else:
+                self.stale += 1
+        return self.__fetch(symbol)
+
+    def __fetch(self, symbol) -> dict:
+        """
+        Fetches and caches the quote of a symbol, or waits for the fetch already in flight for it.
+
+        :param symbol: Stock ticker (symbol).
+        :type symbol: str
+
+        :return: Quote.
+        :rtype: dict
+        """
+        with self.__lock:
+            inflight = self.__inflight.get(symbol)
+            leader = inflight is None
+            if leader:
+                inflight = self.__inflight[symbol] = threading.Event()
+                inflight.started = time.monotonic()
+            else:
+                self.coalesced += 1
+        if not leader:
+            inflight.wait()
+            with self.__lock:
+                fetched, quote = self.__quotes.get(symbol, (None, None))
+            # No quote stored since the fetch waited on started means it failed.
+            if fetched is not None and fetched >= inflight.started:
+                return quote
+            raise Exception(f"Failure to fetch quote of {symbol}.")
+        try:
+            quote = self.fetch(symbol)
+        except Exception:
+            with self.__lock:
+                self.errors += 1
+            raise
+        else:
+            with self.__lock:
+                self.fetches += 1
+                self.__quotes[symbol] = (inflight.started, quote)
+            return quote
+        finally:
+            with self.__lock:
+                del self.__inflight[symbol]
+            inflight.set()
+
+    def invalidate(self, symbol=None) -> None:
+        """
+        Drops the cached quote of a symbol.
+
+        :param symbol: Stock ticker (symbol), defaults to all symbols.
+        :type symbol: str, optional
+
+        :return: None
+        """
+        with self.__lock:
+            if symbol is None:
+                self.__quotes.clear()
+            else:
+                self.__quotes.pop(symbol, None)
+
+    def watch(self, symbol, interval=1.0) -> None:
+        """
+        Keeps the quote of a symbol refreshed in the background, replacing any symbol watched before. Returns
+        immediately.
+
+        :param symbol: Stock ticker (symbol), None to stop refreshing.
+        :type symbol: str
+        :param interval: Seconds between refreshes, defaults to 1.
+        :type interval: float, optional
+
+        :return: None
+        """
+        with self.__lock:
+            self.__watched = symbol
+            self.__interval = interval
+            if symbol is not None and self.__thread is None:
+                self.__thread = threading.Thread(
+                    target=self.__run, name="quotes", daemon=True
+                )
+                self.__thread.start()
+        self.__wake.set()
+
+    def __run(self) -> None:
+        """
+        Refresher thread. Refetches the watched symbol's quote once it is interval seconds old, timed from when the
+        request was sent. After a failed fetch it waits interval seconds, doubling with each further failure.
+
+        :return: None
+        """
+        failures = 0
+        while True:
+            with self.__lock:
+                symbol = self.__watched
+                interval = self.__interval
+            if symbol is None:
+                self.__wake.wait()
+                self.__wake.clear()
+                continue
+            age = self.age(symbol)
+            if age is None or age >= interval:
+                try:
+                    self.__fetch(symbol)
+                    with self.__lock:
+                        self.refreshes += 1
+                    failures = 0
+                except Exception as error:
+                    logging.warning(f"Failure to refresh quote of {symbol}: {error}")
+                    # Back off, doubling up to a minute, rather than retry a
+                    # failing fetch as fast as it fails.
+                    failures += 1
+                    delay = min(60.0, interval * 2 ** (failures - 1))
+                else:
+                    delay = max(0.0, interval - (self.age(symbol) or 0.0))
+            else:
+                delay = interval - age
+            # Woken early when the watched symbol changes.
+            if self.__wake.wait(delay):
+                self.__wake.clear()
+                failures = 0
+
+    def close(self) -> None:
+        """
+        Stops the background refresher.
+
+        :return: None
+        """
+        self.watch(None)
+
+
+if __name__ == "__main__":
+    raise Exception("This module is not an entry point!")
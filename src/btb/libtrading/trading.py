@@ -12,11 +12,18 @@
 import datetime
 import logging
 import math
+import threading
 from typing import Dict
 
 # From pyrh
 from pyrh import Robinhood
 
+# From libtrading
+from .account import AccountSnapshot
+from .instruments import INSTRUMENT_FILE, InstrumentCache
+from .positions import PositionBook
+from .quotes import QuoteCache
+
 
 class Trading:
     """
@@ -28,13 +35,40 @@ class Trading:
     :type password: str
     :param qr_code: QR code of account to log into, needed to avoid full two step verification process for each login.
     :type qr_code: str
+    :param quote_max_age: Seconds a cached quote may be reused for, defaults to 2.
+    :type quote_max_age: float, optional
+    :param quote_refresh: Seconds between background refreshes of the quote of the watched stock, defaults to 1.
+    :type quote_refresh: float, optional
+    :param account_max_age: Seconds an account snapshot is used for unless an order is placed, defaults to 60.
+    :type account_max_age: float, optional
+    :param instrument_file: Instrument cache database, defaults to instruments.sqlite3 in the data folder of this
+        package.
+    :type instrument_file: str, optional
+    :param position_reconcile: Seconds between reconciliations of the position book with Robinhood, defaults to 300.
+    :type position_reconcile: float, optional
     """
 
-    def __init__(self, username, password, qr_code):
+    def __init__(
+        self,
+        username,
+        password,
+        qr_code,
+        quote_max_age=2.0,
+        quote_refresh=1.0,
+        account_max_age=60.0,
+        instrument_file=INSTRUMENT_FILE,
+        position_reconcile=300.0,
+    ):
         """
         Constructor method.
         """
+        self.quote_refresh = quote_refresh
+        self.account_max_age = account_max_age
+        self.__account = None
+        self.__lock = threading.Lock()
         self.rh = Robinhood()
+        self.quotes = QuoteCache(self.rh.get_quote, quote_max_age)
+        self.instruments = InstrumentCache(self.rh, instrument_file)
         if self.rh.login(
             username=username,
             password=password,
@@ -44,7 +78,63 @@ class Trading:
         else:
             logging.error(f"Failed to sign in to Robinhood account {username}.")
             raise Exception(f"Failed to sign in to Robinhood account {username}.")
-        account_info = self.rh.get_account()
+        self.account()
+        self.positions = PositionBook(
+            lambda: self.rh.securities_owned()["results"], position_reconcile
+        )
+
+    def prefetch(self, ticker) -> None:
+        """
+        Fetches the quote and instrument data of a stock ticker ahead of a possible trade, so that a trade shortly
+        after does not have to wait on them. Safe to call from a background thread.
+
+        :param ticker: Stock ticker (symbol).
+        :type ticker: str
+
+        :return: None.
+        """
+        self.instruments.lookup(ticker)
+        self.quotes.get(ticker)
+
+    def watch(self, ticker) -> None:
+        """
+        Keeps the quote of a stock ticker, e.g. the one on screen, refreshed in the background every quote_refresh
+        seconds, so that a trade in it prices from a recent quote without waiting on one. Returns immediately.
+
+        :param ticker: Stock ticker (symbol), None to stop refreshing.
+        :type ticker: str
+
+        :return: None.
+        """
+        self.quotes.watch(ticker, self.quote_refresh)
+
+    def account(self):
+        """
+        Returns the account snapshot, fetching a new one if there is none yet, an order was placed since or it is
+        older than account_max_age. Every step of a trade shares the same snapshot.
+
+        :return: Account snapshot.
+        :rtype: AccountSnapshot
+        """
+        with self.__lock:
+            account = self.__account
+        if account is None or account.age > self.account_max_age:
+            account = AccountSnapshot(self.rh)
+            logging.debug(
+                f"Account snapshot fetched, buying power: {account.buying_power}, equity: {account.equity}"
+            )
+            with self.__lock:
+                self.__account = account
+        return account
+
+    def invalidate_account(self) -> None:
+        """
+        Discards the account snapshot, so that the next one is fetched. Called after each order.
+
+        :return: None.
+        """
+        with self.__lock:
+            self.__account = None
 
     def buy_dollar_amount(self, ticker, dollar_amount) -> None:
         """
@@ -57,7 +147,7 @@ class Trading:
 
         :return: None.
         """
-        self.quote = self.rh.get_quote(ticker)
+        self.quote = self.quotes.get(ticker)
         dollar_amount = self.round_decimals_down(dollar_amount)
         shares = float(dollar_amount) / float(self.quote["ask_price"])
         self.buy_quantity(ticker, shares)
@@ -71,7 +161,7 @@ class Trading:
 
         :return: None.
         """
-        self.buy_dollar_amount(ticker, float(self.rh.get_account()["buying_power"]))
+        self.buy_dollar_amount(ticker, self.account().buying_power)
 
     def buy_quantity(self, ticker, quantity) -> None:
         """
@@ -84,8 +174,8 @@ class Trading:
 
         :return: None.
         """
-        self.account_info = self.rh.get_account()
-        self.quote = self.rh.get_quote(ticker)
+        self.account_info = self.account().account
+        self.quote = self.quotes.get(ticker)
         quantity = self.round_decimals_down(quantity)
         logging.info(f"Buy triggered for {ticker}.")
         logging.info(f"Current ask price is {self.quote['ask_price']}.")
@@ -103,15 +193,18 @@ class Trading:
         ):
             logging.warning(f"Failed to purchase {ticker}, insufficient buying power!")
             return
-        self.rh.place_market_buy_order(
+        instrument_id, instrument_url = self.instruments.lookup(ticker)
+        order = self.rh.place_market_buy_order(
             symbol=ticker,
-            instrument_URL=self.rh.instrument(ticker)["url"],
+            instrument_URL=instrument_url,
             time_in_force="GFD",
             quantity=quantity,
         )
-        self.account_info = self.rh.get_account()
-        logging.info(f"Purchase of {ticker} successful.")
-        logging.info(f"Remaining buying power is {self.account_info['buying_power']}")
+        self.invalidate_account()
+        filled = self.positions.record(instrument_id, order, "buy")
+        logging.info(
+            f"Purchase of {ticker} placed, state: {(order or {}).get('state')}, filled: {filled}."
+        )
 
     def get_least_recently_purchased(self) -> Dict[str, float]:
         """
@@ -120,22 +213,15 @@ class Trading:
         :return: Dictionary containing Robinhood instrument ID and quantity of least recently purchased stock.
         :rtype: dict[str, float]
         """
-        stocks_owned = pd.DataFrame.from_records(self.rh.securities_owned()["results"])
-        if stocks_owned.empty:
+        least = self.positions.least_recently_purchased()
+        if least is None:
             logging.error(
                 "Attempting to find least recently purchased stock, but own none!"
             )
             raise Exception(
                 "Attempting to find least recently purchased stock, but own none!"
             )
-        stocks_owned["updated_at"] = pd.to_datetime(stocks_owned["updated_at"])
-        stocks_owned = stocks_owned.sort_values(by=["updated_at"])
-        stocks_owned = stocks_owned.reset_index()
-
-        return {
-            "instrument_id": stocks_owned["instrument_id"][0],
-            "quantity": stocks_owned["quantity"][0],
-        }
+        return {"instrument_id": least[0], "quantity": least[1]}
 
     def liquidity(self) -> int:
         """
@@ -146,7 +232,7 @@ class Trading:
         :return: Integer percentage of account liquidity.
         :rtype: int
         """
-        return round((float(self.rh.get_account()["buying_power"]) / float(self.rh.portfolios()["equity"])), 2)
+        return round(self.account().liquidity, 2)
 
     def round_decimals_down(self, number: float, decimals: int = 5) -> float:
         """
@@ -182,7 +268,7 @@ class Trading:
 
         :return: None.
         """
-        self.quote = self.rh.get_quote(ticker)
+        self.quote = self.quotes.get(ticker)
         dollar_amount = self.round_decimals_down(dollar_amount)
         shares = float(dollar_amount) / float(self.quote["ask_price"])
         self.sell_quantity(ticker, shares)
@@ -198,8 +284,8 @@ class Trading:
 
         :return: None.
         """
-        self.account_info = self.rh.get_account()
-        self.quote = self.rh.get_quote(ticker)
+        self.account_info = self.account().account
+        self.quote = self.quotes.get(ticker)
         quantity = self.round_decimals_down(quantity)
         logging.info(f"Sell triggered for {ticker}.")
         logging.info(f"Current bid price is {self.quote['bid_price']}.")
@@ -211,17 +297,8 @@ class Trading:
         )
 
         # Verify stock is owned.
-        stocks_owned = self.rh.securities_owned()
-        stock_to_sell_instrument_url = self.rh.instrument(ticker)["url"]
-
-        can_sell = False
-        for stock in stocks_owned["results"]:
-            if (
-                stock_to_sell_instrument_url.strip("/").rsplit("/")[-1]
-                == stock["url"].strip("/").rsplit("/")[-1]
-            ):
-                can_sell = True
-                break
+        instrument_id, stock_to_sell_instrument_url = self.instruments.lookup(ticker)
+        can_sell = self.positions.owns(instrument_id)
 
         # If owned sell.
         if not can_sell:
@@ -229,15 +306,17 @@ class Trading:
             return
         else:
             logging.info(f"Security {ticker} found within securities owned.")
-        self.rh.place_market_sell_order(
+        order = self.rh.place_market_sell_order(
             symbol=ticker,
             instrument_URL=stock_to_sell_instrument_url,
             time_in_force="GFD",
             quantity=quantity,
         )
-        self.account_info = self.rh.get_account()
-        logging.info(f"Sale of {ticker} successful.")
-        logging.info(f"Current buying power is {self.account_info['buying_power']}")
+        self.invalidate_account()
+        filled = self.positions.record(instrument_id, order, "sell")
+        logging.info(
+            f"Sale of {ticker} placed, state: {(order or {}).get('state')}, filled: {filled}."
+        )
 
 
 if __name__ == "__main__":